@@ -0,0 +1 @@
+"""Benchmarks which are not a part of the test suite, run them with make."""
@@ -0,0 +1,278 @@
+"""Measures throughput and latency of the authenticated endpoints.
+
+The whole ASGI app is driven in-process with the httpx client, the same way
+the tests do, backed by an in-memory sqlite database. Credential rate limits
+are lifted, so the hashing and token handling are what's measured.
+Results are saved as json, along with the hashing and token settings,
+so runs with different configurations can be compared.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from httpx import AsyncClient, Response
+from pydantic import SecretStr
+from tortoise import Tortoise
+
+from src.database.models import Image, Plant, User
+from src.database.models.enums import Conditions
+from src.main import create_application
+from src.services.cache import tokens_cache
+from src.services.hashing import HashingService
+from src.services.jwt_token import JWT_ALGORITHM, JwtTokenService
+from src.services.rate_limit import email_limiter, ip_limiter
+from src.services.refresh_token import RefreshTokenService
+from src.settings import settings
+
+EMAIL = "benchmark@auth.com"
+PASSWORD = "benchmark-password"
+PLANTS = 50
+
+"""Settings describing the configuration under the benchmark."""
+CONFIGURATION_SETTINGS = (
+    "HASHING_SCHEMES",
+    "HASHING_WORKERS",
+    "HASHING_MAX_PENDING",
+    "BCRYPT_ROUNDS",
+    "ARGON2_TIME_COST",
+    "ARGON2_MEMORY_COST",
+    "SCRYPT_ROUNDS",
+    "ACCESS_TOKEN_LIFETIME",
+    "TOKENS_CACHE_SIZE",
+    "USERS_CACHE_TTL",
+    "PAGE_SIZE",
+)
+
+SCENARIOS = (
+    "login",
+    "refresh",
+    "token_refresh",
+    "token_protected",
+    "token_protected_uncached",
+    "dashboard",
+    "plant_details",
+)
+
+Call = Callable[[AsyncClient], Awaitable[Response]]
+
+
+async def create_data() -> tuple[User, Plant]:
+    """Creates the superuser with a page of not accepted plants,
+    listed by the dashboard.
+    """
+    user = await User.create(
+        email=EMAIL,
+        hashed_password=HashingService.get_hashed_password(SecretStr(PASSWORD)),
+        is_superuser=True,
+    )
+    for index in range(PLANTS):
+        image = await Image.create(name=f"{index}.jpg", path=f"static/{index}.jpg")
+        plant = await Plant.create(
+            name=f"Plant {index}",
+            description="Benchmark plant " * 8,
+            temperature=Conditions.low,
+            humidity=Conditions.high,
+            is_accepted=False,
+            creator=user,
+            image=image,
+        )
+    return user, plant
+
+
+async def check_dashboard(client: AsyncClient, dashboard: Call) -> None:
+    """Makes sure the dashboard renders a full page of cards,
+    so its results don't describe an empty template.
+    """
+    response = await dashboard(client)
+    cards = response.text.count('<div class="card text-center')
+    expected = min(settings.PAGE_SIZE, PLANTS)
+    if response.status_code != 200 or cards != expected:
+        raise RuntimeError(
+            f"Dashboard rendered {cards} cards with status {response.status_code}, "
+            f"expected {expected}"
+        )
+
+
+def build_scenarios(user: User, plant: Plant, legacy_tokens: bool) -> dict[str, Call]:
+    """Returns the measured calls by their names.
+
+    Legacy tokens have only the email, so every call falls back to the user lookup.
+    Uncached token calls drop the verified tokens first, so each one checks
+    the signature again.
+    """
+    if legacy_tokens:
+        access_token = JwtTokenService.encode_jwt(user.email).access_token
+    else:
+        access_token = JwtTokenService.encode_user_jwt(user).access_token
+    headers = {"Authorization": f"Bearer {access_token}"}
+    cookies = {"access_token": f"Bearer {access_token}"}
+    credentials = json.dumps({"email": EMAIL, "password": PASSWORD})
+    refresh_tokens: list[str] = []
+
+    async def login(client: AsyncClient) -> Response:
+        return await client.post("/api/users/login", data=credentials)
+
+    async def refresh(client: AsyncClient) -> Response:
+        return await client.get("/api/users/refresh", headers=headers)
+
+    async def token_refresh(client: AsyncClient) -> Response:
+        refresh_token = refresh_tokens.pop() if refresh_tokens else None
+        if refresh_token is None:
+            refresh_token = await RefreshTokenService.issue(user)
+        response = await client.post(
+            "/api/users/token/refresh", json={"refresh_token": refresh_token}
+        )
+        if response.status_code == 200:
+            refresh_tokens.append(response.json()["refresh_token"])
+        return response
+
+    async def token_protected(client: AsyncClient) -> Response:
+        return await client.get("/api/hashing/stats", headers=headers)
+
+    async def token_protected_uncached(client: AsyncClient) -> Response:
+        tokens_cache.clear()
+        return await client.get("/api/hashing/stats", headers=headers)
+
+    async def dashboard(client: AsyncClient) -> Response:
+        return await client.get("/", cookies=cookies)
+
+    async def plant_details(client: AsyncClient) -> Response:
+        return await client.get(f"/plants/{plant.pk}", cookies=cookies)
+
+    return {
+        "login": login,
+        "refresh": refresh,
+        "token_refresh": token_refresh,
+        "token_protected": token_protected,
+        "token_protected_uncached": token_protected_uncached,
+        "dashboard": dashboard,
+        "plant_details": plant_details,
+    }
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    """Returns the nearest rank percentile of sorted latencies."""
+    index = min(len(latencies) - 1, max(0, round(fraction * len(latencies)) - 1))
+    return latencies[index]
+
+
+async def measure(
+    client: AsyncClient, call: Call, requests: int, concurrency: int
+) -> dict:
+    """Sends the requests from concurrent workers and summarizes their latencies."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await call(client)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    await call(client)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(requests / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 0.5) * 1000, 3),
+            "p90": round(percentile(latencies, 0.9) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+    }
+
+
+async def main(
+    names: list[str],
+    requests: int,
+    login_requests: int,
+    concurrency: int,
+    legacy_tokens: bool,
+    output: Optional[Path],
+) -> None:
+    """Runs the chosen scenarios, prints and saves their results."""
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": settings.APP_MODELS}
+    )
+    await Tortoise.generate_schemas()
+    ip_limiter.burst = email_limiter.burst = float("inf")
+    user, plant = await create_data()
+    scenarios = build_scenarios(user, plant, legacy_tokens)
+    results = {}
+    async with AsyncClient(
+        app=create_application(), base_url="https://testserver"
+    ) as client:
+        if "dashboard" in names:
+            await check_dashboard(client, scenarios["dashboard"])
+        for name in names:
+            count = login_requests if name == "login" else requests
+            results[name] = await measure(client, scenarios[name], count, concurrency)
+            latency = results[name]["latency_ms"]
+            print(
+                f"{name}: {results[name]['requests_per_second']} req/s, "
+                f"p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+                f"{results[name]['errors']} errors"
+            )
+    await Tortoise.close_connections()
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "version": settings.VERSION,
+        "python": platform.python_version(),
+        "concurrency": concurrency,
+        "legacy_tokens": legacy_tokens,
+        "jwt_algorithm": JWT_ALGORITHM,
+        "settings": {name: getattr(settings, name) for name in CONFIGURATION_SETTINGS},
+        "results": results,
+    }
+    if output is None:
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        output = Path(__file__).parent / "results" / f"auth-{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measures throughput and latency of the authenticated endpoints."
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument(
+        "--login-requests", type=int, default=50, help="logins hash the password"
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--legacy-tokens",
+        action="store_true",
+        help="use tokens without the user claims",
+    )
+    parser.add_argument("--output", type=Path, help="defaults to benchmarks/results")
+    arguments = parser.parse_args()
+    asyncio.run(
+        main(
+            arguments.scenarios,
+            arguments.requests,
+            arguments.login_requests,
+            arguments.concurrency,
+            arguments.legacy_tokens,
+            arguments.output,
+        )
+    )
@@ -0,0 +1,97 @@
+"""Compares CPU time of plant serialization paths per 1000 rows.
+
+Uses an in-memory sqlite database, so only the orm and serialization
+overhead is measured, not the network round trip to postgres.
+"""
+import json
+import time
+from typing import Awaitable, Callable
+
+from tortoise import Tortoise, run_async
+
+from src.database.models import Image, Plant, User
+from src.database.models.enums import Conditions
+from src.schemas.plants import (
+    PLANT_FIELDS,
+    PLANT_LIST_FIELDS,
+    PlantModel,
+    PlantQuerySet,
+    plant_payload,
+)
+
+ROWS = 1000
+ROUNDS = 10
+
+
+async def create_plants() -> None:
+    """Fills the database with accepted plants of a single creator."""
+    user = await User.create(email="benchmark@plants.com", hashed_password="-")
+    for index in range(ROWS):
+        image = await Image.create(name=f"{index}.jpg", path=f"static/{index}.jpg")
+        await Plant.create(
+            name=f"Plant {index}",
+            description="Benchmark plant " * 8,
+            temperature=Conditions.low,
+            humidity=Conditions.high,
+            is_accepted=True,
+            creator=user,
+            image=image,
+        )
+
+
+async def orm_list() -> str:
+    """Current list path: orm instances validated by PlantQuerySet."""
+    plants = await PlantQuerySet.from_queryset(Plant.filter(is_accepted=True))
+    return plants.json()
+
+
+async def values_list() -> str:
+    """Projection list path: values() rows turned into dicts."""
+    rows = await Plant.filter(is_accepted=True).values(*PLANT_LIST_FIELDS)
+    return json.dumps([plant_payload(row) for row in rows])
+
+
+async def orm_details() -> str:
+    """Current details path: orm instances with fetched creator and PlantModel."""
+    plants = await Plant.filter(is_accepted=True).prefetch_related("creator")
+    return json.dumps(
+        [json.loads(PlantModel.from_orm(plant).json()) for plant in plants]
+    )
+
+
+async def values_details() -> str:
+    """Projection details path: values() rows with creator_id."""
+    rows = await Plant.filter(is_accepted=True).values(*PLANT_FIELDS)
+    return json.dumps([plant_payload(row) for row in rows])
+
+
+async def measure(serialize: Callable[[], Awaitable[str]]) -> float:
+    """Returns the average CPU milliseconds spent on serializing 1000 rows."""
+    await serialize()
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        await serialize()
+    return (time.process_time() - start) / ROUNDS * 1000 * 1000 / ROWS
+
+
+async def main() -> None:
+    """Runs all the serialization paths and prints the results."""
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["src.database.models"]}
+    )
+    await Tortoise.generate_schemas()
+    await create_plants()
+    for name, current, projection in (
+        ("list", orm_list, values_list),
+        ("details", orm_details, values_details),
+    ):
+        current_ms, projection_ms = await measure(current), await measure(projection)
+        print(
+            f"{name}: orm {current_ms:.2f} ms, values {projection_ms:.2f} ms "
+            f"per {ROWS} rows ({current_ms / projection_ms:.1f}x)"
+        )
+    await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    run_async(main())
@@ -1,7 +1,9 @@
+import asyncio
 from abc import ABC
 from asyncio import iscoroutinefunction
 from typing import Any, Dict, Type
 
+from src.api.forms.lookups import FormLookups
 from src.api.forms.mixins import FormCreateMixin, FormUpdateMixin
 from src.api.forms.validators.generic import GenericValidator
 
@@ -16,19 +18,56 @@ class GenericForm(ABC):
         self.errors: list[str] = []
         self.data: Dict[str, Any] = {}
         self.validators: list[Type[GenericValidator]] = []
+        self.lookups = FormLookups()
 
     async def validate(self) -> None:
         """Runs the validators and merge the errors lists.
 
-        If validator is async, awaits the coroutine.
+        Cheap sync validators run first and if any of them fails,
+        async ones, hitting the db or hashing, are skipped.
+        Validators share the lookups, so each entity is fetched only once.
         """
-        for validator_class in self.validators:
-            validator = validator_class()
+        validators = [
+            validator_class(self.lookups) for validator_class in self.validators
+        ]
+        async_validators = []
+        for validator in validators:
             if iscoroutinefunction(validator.validate):
-                await validator.validate(self.data)
-            else:
-                validator.validate(self.data)
+                async_validators.append(validator)
+                continue
+            validator.validate(self.data)
             self.errors += validator.errors
+        if not self.errors:
+            await self.run_async_validators(async_validators)
+
+    async def run_async_validators(self, validators: list[GenericValidator]) -> None:
+        """Runs the async validators in stages, independent ones concurrently.
+
+        Validator waits for the ones listed in its depends_on,
+        and is skipped if any of them fails.
+        """
+        present = {type(validator) for validator in validators}
+        passed, failed = set(), set()
+        pending = validators
+        while pending:
+            ready, waiting = [], []
+            for validator in pending:
+                dependencies = present & set(validator.depends_on)
+                if dependencies & failed:
+                    failed.add(type(validator))
+                elif dependencies <= passed:
+                    ready.append(validator)
+                else:
+                    waiting.append(validator)
+            if not ready and len(waiting) == len(pending):
+                raise ValueError("Validators dependencies are circular")
+            await asyncio.gather(
+                *(validator.validate(self.data) for validator in ready)
+            )
+            for validator in ready:
+                self.errors += validator.errors
+                (failed if validator.errors else passed).add(type(validator))
+            pending = waiting
 
 
 class ModelCreateForm(GenericForm, FormCreateMixin, ABC):
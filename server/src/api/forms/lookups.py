@@ -0,0 +1,40 @@
+import asyncio
+from typing import Optional, Type
+
+from src.database.models.generic import GenericModel
+
+
+class FormLookups:
+    """Database lookups shared by the validators of a single form submission.
+
+    Each entity is fetched at most once, missing ones are remembered as well.
+    Concurrent validators asking for the same entity wait for a single query.
+    """
+
+    def __init__(self):
+        """Initializes an empty storage."""
+        self.instances: dict[tuple, Optional[GenericModel]] = {}
+        self.queries: dict[tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def build_key(model: Type[GenericModel], filters: dict) -> tuple:
+        """Builds a storage key out of the model and lookup filters."""
+        return model, tuple(sorted(filters.items()))
+
+    async def get_or_none(
+        self, model: Type[GenericModel], **filters
+    ) -> Optional[GenericModel]:
+        """Returns the instance matching the filters, querying the db only once."""
+        key = self.build_key(model, filters)
+        if key in self.instances:
+            return self.instances[key]
+        if key not in self.queries:
+            self.queries[key] = asyncio.ensure_future(model.get_or_none(**filters))
+        self.instances[key] = await self.queries[key]
+        return self.instances[key]
+
+    def remember(
+        self, model: Type[GenericModel], instance: Optional[GenericModel], **filters
+    ) -> None:
+        """Stores an already fetched instance, so it doesn't have to be queried."""
+        self.instances[self.build_key(model, filters)] = instance
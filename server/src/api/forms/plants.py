@@ -2,11 +2,17 @@ from typing import Optional
 
 from fastapi import Depends, UploadFile
 from fastapi.params import File, Form
+from tortoise.expressions import F
 
 from src.api.forms.generic import ModelCreateForm, ModelUpdateForm
-from src.api.forms.validators.plants import ConditionsValidator, NameLengthValidator
+from src.api.forms.validators.plants import (
+    ConditionsValidator,
+    ImageSizeValidator,
+    NameLengthValidator,
+)
 from src.api.middleware.context import context_middleware
-from src.database.models import Plant
+from src.database.models import Image, Plant
+from src.services.cache import invalidate_plant_cache
 from src.services.images import ImageService
 
 
@@ -39,7 +45,7 @@ class PlantCreateForm(ModelCreateForm):
             "image": image,
             "is_accepted": False,
         }
-        self.validators = [NameLengthValidator, ConditionsValidator]
+        self.validators = [NameLengthValidator, ConditionsValidator, ImageSizeValidator]
         self.context = context
 
     async def clean(self) -> None:
@@ -47,6 +53,12 @@ class PlantCreateForm(ModelCreateForm):
         image = await ImageService.create_image(self.data["image"], "plant_images")
         self.data["image"] = image
 
+    async def create(self) -> Plant:
+        """Creates the plant and drops cached plant lists."""
+        plant = await super().create()
+        invalidate_plant_cache(plant.pk)
+        return plant
+
 
 class PlantEditForm(ModelUpdateForm):
     """Form for editing plants.
@@ -73,7 +85,7 @@ class PlantEditForm(ModelUpdateForm):
             "image": image,
             "creator": context.get("user"),
         }
-        self.validators = [NameLengthValidator, ConditionsValidator]
+        self.validators = [NameLengthValidator, ConditionsValidator, ImageSizeValidator]
         self.context = context
 
     async def clean(self) -> None:
@@ -84,3 +96,20 @@ class PlantEditForm(ModelUpdateForm):
             return
         image = await ImageService.create_image(image_file, "plant_images")
         self.data["image"] = image
+
+    async def update(self, instance: Plant) -> Plant:
+        """Updates the plant, bumps its version and drops its cached reads.
+
+        Version is bumped in the database, so a concurrent bump
+        of the derivatives pipeline isn't lost, and read back afterwards.
+        Replaced image gets deleted along with its files.
+        """
+        instance.version = F("version") + 1
+        image_id = instance.image_id
+        plant = await super().update(instance)
+        await plant.refresh_from_db(fields=["version"])
+        if plant.image_id != image_id:
+            image = await Image.get(pk=image_id)
+            await image.delete()
+        invalidate_plant_cache(plant.pk)
+        return plant
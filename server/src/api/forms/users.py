@@ -13,7 +13,9 @@ from src.api.forms.validators.users import (
 )
 from src.api.middleware.context import context_middleware
 from src.database.models import User
+from src.database.models.generic import GenericModel
 from src.services.hashing import HashingService
+from src.services.refresh_token import RefreshTokenService
 
 
 class UserCreateForm(ModelCreateForm):
@@ -47,7 +49,7 @@ class UserCreateForm(ModelCreateForm):
         password = self.data["password"]
         self.data = {
             "email": email,
-            "hashed_password": HashingService.get_hashed_password(password),
+            "hashed_password": await HashingService.get_hashed_password_async(password),
         }
 
 
@@ -86,6 +88,8 @@ class PasswordChangeForm(ModelUpdateForm):
             "password_confirm": password_confirm,
             "email": getattr(context.get("user"), "email", None),
         }
+        if context.get("user"):
+            self.lookups.remember(User, context["user"], email=self.data["email"])
         self.validators = [
             PasswordLengthValidator,
             PasswordsMatchValidator,
@@ -96,5 +100,15 @@ class PasswordChangeForm(ModelUpdateForm):
     async def clean(self) -> None:
         """Sets the hashed password value."""
         self.data = {
-            "hashed_password": HashingService.get_hashed_password(self.data["password"])
+            "hashed_password": await HashingService.get_hashed_password_async(
+                self.data["password"]
+            )
         }
+
+    async def update(self, instance: GenericModel) -> GenericModel:
+        """Updates the password and revokes users refresh tokens,
+        so sessions started with the old password can't be prolonged.
+        """
+        instance = await super().update(instance)
+        await RefreshTokenService.revoke_user(instance)
+        return instance
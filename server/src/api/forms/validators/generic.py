@@ -1,12 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Type
+
+from src.api.forms.lookups import FormLookups
 
 
 class GenericValidator(ABC):
-    """Interface for form validators."""
+    """Interface for form validators.
+
+    Async validators can list the ones they depend on,
+    they are run only if all of them pass.
+    """
+
+    depends_on: tuple[Type["GenericValidator"], ...] = ()
 
-    def __init__(self):
-        """Errors are initialized are an empty list."""
+    def __init__(self, lookups: Optional[FormLookups] = None):
+        """Errors are initialized are an empty list.
+
+        Lookups are shared with other validators of the same form.
+        """
         self.errors: list[str] = []
+        self.lookups = lookups or FormLookups()
 
     @abstractmethod
     def validate(self, data: dict):
@@ -1,5 +1,8 @@
+import os
+
 from src.api.forms.validators.generic import GenericValidator
 from src.database.models.enums import Conditions
+from src.settings import settings
 
 
 class NameLengthValidator(GenericValidator):
@@ -16,3 +19,16 @@ class ConditionsValidator(GenericValidator):
             self.errors.append("Wrong temperature value")
         if not data["humidity"] in Conditions.__members__:
             self.errors.append("Wrong humidity value")
+
+
+class ImageSizeValidator(GenericValidator):
+    def validate(self, data: dict) -> None:
+        """Checks the size of the uploaded image, before it gets stored."""
+        image_file = data["image"].file
+        image_file.seek(0, os.SEEK_END)
+        size = image_file.tell()
+        image_file.seek(0)
+        if size > settings.MAX_IMAGE_SIZE:
+            self.errors.append(
+                f"Image can't be larger than {settings.MAX_IMAGE_SIZE // 1024 ** 2} MB"
+            )
@@ -1,6 +1,6 @@
 from src.api.forms.validators.generic import GenericValidator
+from src.database.crud.users import verify_user_password
 from src.database.models import User
-from src.services.hashing import HashingService
 
 
 class EmailLengthValidator(GenericValidator):
@@ -16,9 +16,7 @@ class EmailLengthValidator(GenericValidator):
 class UserExistsValidator(GenericValidator):
     async def validate(self, data: dict) -> None:
         """Checks if user already exists."""
-        if len(data["email"]) > 127:
-            return
-        if await User.get_or_none(email=data["email"]):
+        if await self.lookups.get_or_none(User, email=data["email"]):
             self.errors.append("User with that email already exists")
 
 
@@ -45,21 +43,20 @@ class PasswordsMatchValidator(GenericValidator):
 class UserDontExistValidator(GenericValidator):
     async def validate(self, data: dict) -> None:
         """Checks if user does not exist."""
-        if not await User.get_or_none(email=data["email"]):
+        if not await self.lookups.get_or_none(User, email=data["email"]):
             return self.errors.append("User with that email does not exist")
 
 
 class PasswordCorrectValidator(GenericValidator):
     password_field = "password"
+    depends_on = (UserDontExistValidator,)
 
     async def validate(self, data: dict) -> None:
         """Checks if password is correct comparing to one stored in the db."""
-        user = await User.get_or_none(email=data["email"])
+        user = await self.lookups.get_or_none(User, email=data["email"])
         if not user:
             return
-        if not HashingService.verify_password(
-            data[self.password_field], user.hashed_password
-        ):
+        if not await verify_user_password(user, data[self.password_field]):
             self.errors.append("Password you have entered is not correct")
 
 
@@ -6,6 +6,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from src.api.middleware.cookie_scheme import CookieBearer
 from src.database.models import User
 from src.schemas.jwt_token import JwtTokenEncoded
+from src.schemas.users import TokenUser
 from src.services.jwt_token import JwtTokenService
 
 http_scheme = HTTPBearer()
@@ -40,6 +41,48 @@ async def user_middleware(
     return user
 
 
+async def token_revoke_middleware(
+    token: HTTPAuthorizationCredentials = Depends(http_scheme),
+) -> bool:
+    """Middleware for revoking jwt token from header.
+
+    Raises an exception if the token is not valid.
+    """
+    if not JwtTokenService.revoke_jwt(token.credentials):
+        raise HTTPException(status_code=401, detail="Token is either wrong or expired")
+    return True
+
+
+async def token_user_middleware(
+    token: HTTPAuthorizationCredentials = Depends(http_scheme),
+) -> TokenUser:
+    """Middleware for validating and decoding jwt token from header.
+
+    Returns the user identity straight from the token claims, so it doesn't
+    need the db, unless the token was issued without them.
+    """
+    decoded_token = JwtTokenService.decode_jwt(token.credentials)
+    if not decoded_token:
+        raise HTTPException(status_code=401, detail="Token is either wrong or expired")
+    user = await JwtTokenService.get_token_user(decoded_token)
+    return user
+
+
+async def superuser_middleware(
+    user: TokenUser = Depends(token_user_middleware),
+) -> TokenUser:
+    """Middleware for allowing only superusers.
+
+    Returns the user from token claims if it's a superuser,
+    otherwise raises an exception.
+    """
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="You are not allowed to perform this action"
+        )
+    return user
+
+
 async def cookie_user_middleware(
     token: Optional[HTTPAuthorizationCredentials] = Depends(cookie_scheme),
 ) -> Optional[User]:
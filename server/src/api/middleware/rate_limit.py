@@ -0,0 +1,49 @@
+import math
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.services.rate_limit import email_limiter, ip_limiter
+
+FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+
+async def read_email(request: Request) -> Optional[str]:
+    """Reads the email from either form or json body.
+
+    Body is already parsed by the route at this point, so it's served from the cache.
+    """
+    if request.headers.get("content-type", "").startswith(FORM_CONTENT_TYPES):
+        email = (await request.form()).get("email")
+    else:
+        try:
+            payload = await request.json()
+        except ValueError:
+            return None
+        email = payload.get("email") if isinstance(payload, dict) else None
+    return email.lower() if isinstance(email, str) else None
+
+
+async def credentials_rate_limit_middleware(request: Request) -> None:
+    """Middleware for limiting the requests that need password hashing.
+
+    Requests are limited per client ip and per account, which is either
+    the email from the body or the user pk from the path.
+    Raises an exception with the time after which the request can be retried.
+    """
+    host = request.client.host if request.client else None
+    limits = [(ip_limiter, ("ip", host))]
+    email = await read_email(request)
+    if email:
+        limits.append((email_limiter, ("email", email)))
+    elif "pk" in request.path_params:
+        limits.append((email_limiter, ("user", request.path_params["pk"])))
+    for limiter, key in limits:
+        wait = limiter.acquire(key)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
@@ -1,6 +1,40 @@
+import hashlib
+
+from fastapi import HTTPException
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from starlette.requests import Request
+from starlette.responses import Response
 from starlette.templating import Jinja2Templates
 
+from src.database.models import Plant
+from src.services.cache import fragments_cache
+from src.settings import settings
+
 templates = Jinja2Templates("templates")
+templates.env.bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATES_CACHE_DIR)
+
+
+def precompile_templates() -> None:
+    """Compiles all the templates up front, so first requests don't have to.
+
+    Compiled code is stored in the bytecode cache and reused by next workers.
+    """
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+
+
+def render_card(plant: Plant) -> Markup:
+    """Renders the plant card, reusing the html cached for its current version."""
+    cache_key = ("card", plant.uuid, plant.version)
+    card = fragments_cache.get(cache_key)
+    if card is None:
+        card = Markup(templates.get_template("plants/card.html").render(plant=plant))
+        fragments_cache.set(cache_key, card)
+    return card
+
+
+templates.env.globals["render_card"] = render_card
 
 
 def TemplateResponse(*args, **kwargs) -> templates.TemplateResponse:
@@ -11,3 +45,42 @@ def TemplateResponse(*args, **kwargs) -> templates.TemplateResponse:
     if not response.context.get("user"):
         response.delete_cookie("access_token")
     return response
+
+
+def ErrorResponse(
+    template: str, context: dict, exception: HTTPException
+) -> templates.TemplateResponse:
+    """Helper response which renders the form with the error of the exception,
+    keeping its status code and headers, such as Retry-After.
+    """
+    context["errors"] = [exception.detail]
+    return TemplateResponse(
+        template, context, exception.status_code, headers=exception.headers
+    )
+
+
+def ConditionalResponse(request: Request, response: Response) -> Response:
+    """Helper response which adds an ETag built from the response body.
+
+    If the client already has the same version, an empty 304 response
+    is returned instead, keeping only the cookie headers.
+    """
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    if not etag_matches(etag, request.headers.get("if-none-match")):
+        response.headers["etag"] = etag
+        return response
+    not_modified = Response(status_code=304, headers={"etag": etag})
+    not_modified.raw_headers += [
+        header for header in response.raw_headers if header[0] == b"set-cookie"
+    ]
+    return not_modified
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Checks if the etag is listed in the If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in client_etags
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from src.api.middleware.authentication import superuser_middleware
+from src.schemas.cache import CachesStats
+from src.schemas.users import TokenUser
+from src.services.cache import fragments_cache, plants_cache, tokens_cache, users_cache
+
+router = APIRouter(prefix="/api/cache", tags=["Cache Api"])
+
+
+@router.get("/stats", status_code=200, response_model=CachesStats)
+async def cache_stats(user: TokenUser = Depends(superuser_middleware)) -> CachesStats:
+    """Retrieves hit, miss and eviction counters of the in-memory caches."""
+    return CachesStats(
+        plants=plants_cache.stats(),
+        fragments=fragments_cache.stats(),
+        tokens=tokens_cache.stats(),
+        users=users_cache.stats(),
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from src.api.middleware.authentication import superuser_middleware
+from src.schemas.hashing import HashingStats
+from src.schemas.users import TokenUser
+from src.services.hashing import hashing_pool
+
+router = APIRouter(prefix="/api/hashing", tags=["Hashing Api"])
+
+
+@router.get("/stats", status_code=200, response_model=HashingStats)
+async def hashing_stats(
+    user: TokenUser = Depends(superuser_middleware),
+) -> HashingStats:
+    """Retrieves the queue depth and counters of the password hashing pool."""
+    return HashingStats(**hashing_pool.stats())
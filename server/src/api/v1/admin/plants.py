@@ -1,16 +1,29 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from src.api.middleware.authentication import user_middleware
+from src.api.middleware.response import ConditionalResponse
 from src.database.crud.plants import (
     create_plant,
     delete_plant,
     get_all_plants,
     get_plant,
+    search_plants,
+    stream_all_plants,
 )
 from src.database.models import User
-from src.schemas.plants import PlantCreate, PlantModel, PlantQuerySet
+from src.schemas.plants import (
+    PlantCreate,
+    PlantFilters,
+    PlantModel,
+    PlantPage,
+    PlantQuerySet,
+)
+from src.settings import settings
 
 router = APIRouter(prefix="/api/plants", tags=["Plants Api"])
 
@@ -26,18 +39,45 @@ async def plant_create(
     return plant
 
 
-@router.get("/", status_code=200, response_model=PlantQuerySet)
-async def plants_list() -> PlantQuerySet:
-    """Retrieves a list of all accepted plants."""
-    plants = await get_all_plants()
-    return plants
+@router.get("/", status_code=200, response_model=PlantPage)
+async def plants_list(
+    request: Request,
+    limit: int = Query(settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    filters: PlantFilters = Depends(),
+) -> Response:
+    """Retrieves a page of accepted plants matching the filters,
+    starting after the given cursor.
+    """
+    plants = await get_all_plants(filters, limit, cursor)
+    return ConditionalResponse(request, JSONResponse(plants))
+
+
+@router.get("/stream", status_code=200, response_model=PlantQuerySet)
+async def plants_stream(filters: PlantFilters = Depends()) -> StreamingResponse:
+    """Streams a list of all accepted plants matching the filters,
+    fetching them from db in chunks.
+    """
+    plants = stream_all_plants(filters, settings.STREAM_CHUNK_SIZE)
+    return StreamingResponse(plants, media_type="application/json")
+
+
+@router.get("/search", status_code=200, response_model=PlantPage)
+async def plants_search(
+    q: str = Query(..., min_length=1, max_length=127),
+    limit: int = Query(settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+) -> JSONResponse:
+    """Retrieves a page of accepted plants matching the query, best matches first."""
+    plants = await search_plants(q, limit, cursor)
+    return JSONResponse(plants)
 
 
 @router.get("/{pk}", status_code=200, response_model=PlantModel)
-async def plant_retrieve(pk: UUID) -> PlantModel:
+async def plant_retrieve(request: Request, pk: UUID) -> Response:
     """Retrieves a specific plant by it's pk."""
     plant = await get_plant(pk)
-    return plant
+    return ConditionalResponse(request, JSONResponse(plant))
 
 
 @router.delete("/{pk}", status_code=200, response_model=bool)
@@ -1,23 +1,39 @@
 from fastapi import APIRouter, Depends
 
-from src.api.middleware.authentication import token_refresh_middleware
-from src.database.crud.users import authenticate_user, create_user
-from src.schemas.jwt_token import JwtTokenEncoded
+from src.api.middleware.authentication import (
+    token_refresh_middleware,
+    token_revoke_middleware,
+)
+from src.api.middleware.rate_limit import credentials_rate_limit_middleware
+from src.database.crud.users import authenticate_user, create_user, refresh_user_tokens
+from src.schemas.jwt_token import JwtTokenEncoded, RefreshTokenPayload
 from src.schemas.users import UserPayload
+from src.services.refresh_token import RefreshTokenService
 
 router = APIRouter(prefix="/api/users", tags=["Users Api"])
 
 
-@router.post("/register", status_code=201, response_model=JwtTokenEncoded)
+@router.post(
+    "/register",
+    status_code=201,
+    response_model=JwtTokenEncoded,
+    dependencies=[Depends(credentials_rate_limit_middleware)],
+)
 async def register(payload: UserPayload) -> JwtTokenEncoded:
-    """Creates a user instance and returns a response with an access token."""
+    """Creates a user instance and returns a response with access and refresh tokens."""
     token = await create_user(payload)
     return token
 
 
-@router.post("/login", response_model=JwtTokenEncoded)
+@router.post(
+    "/login",
+    response_model=JwtTokenEncoded,
+    dependencies=[Depends(credentials_rate_limit_middleware)],
+)
 async def login(payload: UserPayload) -> JwtTokenEncoded:
-    """Given user credentials, creates and returns a new access token."""
+    """Given user credentials, creates and returns a new access token
+    along with a refresh token.
+    """
     token = await authenticate_user(payload)
     return token
 
@@ -28,3 +44,25 @@ async def refresh(
 ) -> JwtTokenEncoded:
     """Checks if the token is valid and refreshes it."""
     return token
+
+
+@router.post("/logout", response_model=bool)
+async def logout(revoked: bool = Depends(token_revoke_middleware)) -> bool:
+    """Revokes the access token, so it can't be used anymore."""
+    return revoked
+
+
+@router.post("/token/refresh", response_model=JwtTokenEncoded)
+async def refresh_token(payload: RefreshTokenPayload) -> JwtTokenEncoded:
+    """Exchanges the refresh token for a new pair of tokens.
+
+    Each refresh token works once, reusing it revokes all of its successors.
+    """
+    token = await refresh_user_tokens(payload.refresh_token)
+    return token
+
+
+@router.post("/token/revoke", response_model=bool)
+async def revoke_refresh_token(payload: RefreshTokenPayload) -> bool:
+    """Revokes the refresh token along with all the tokens rotated out of it."""
+    return await RefreshTokenService.revoke(payload.refresh_token)
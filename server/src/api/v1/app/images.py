@@ -0,0 +1,35 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.responses import FileResponse
+
+from src.database.models import Image
+from src.schemas.images import ImageFormat
+from src.services.images import ImageService
+from src.settings import settings
+
+router = APIRouter(prefix="/images", tags=["Images"], include_in_schema=False)
+
+
+@router.get("/{pk}", status_code=200, response_class=FileResponse)
+async def image_resized(
+    pk: UUID,
+    w: Optional[int] = Query(None, ge=1, le=settings.IMAGE_MAX_DIMENSION),
+    h: Optional[int] = Query(None, ge=1, le=settings.IMAGE_MAX_DIMENSION),
+    fmt: ImageFormat = ImageFormat.webp,
+) -> FileResponse:
+    """Returns the image fitted into given width and height, in given format.
+
+    Dimensions are rounded up to the nearest size bucket. Resized images
+    are cached on disk and never change, so clients can keep them.
+    """
+    image = await Image.get_or_none(pk=pk)
+    if not image:
+        raise HTTPException(status_code=404, detail="Image does not exist")
+    location = await ImageService.get_resized_image(image, w, h, fmt.value)
+    return FileResponse(
+        location,
+        media_type=f"image/{fmt.value}",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
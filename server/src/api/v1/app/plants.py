@@ -1,38 +1,90 @@
-from typing import Union
+from typing import Optional, Union
+from urllib.parse import urlencode
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
 from starlette.responses import HTMLResponse, RedirectResponse
 
 from src.api.forms.plants import PlantCreateForm, PlantEditForm
 from src.api.middleware.context import context_middleware
-from src.api.middleware.response import TemplateResponse
+from src.api.middleware.response import ConditionalResponse, TemplateResponse
+from src.database.crud.plants import get_plants_page, search_plants_page
 from src.database.models import Plant
+from src.database.models.enums import Conditions
+from src.schemas.plants import PlantFilters, PlantSort
+from src.services.cache import plants_cache
+from src.settings import settings
 
 router = APIRouter(tags=["Plants"], include_in_schema=False)
 
 
+async def get_dashboard_page(
+    q: Optional[str], filters: PlantFilters, cursor: Optional[str] = None
+) -> tuple[list[Plant], Optional[str]]:
+    """Retrieves a page of dashboard plants and an url of the next page cards.
+
+    Plants are matching the search query if it's given, the filters otherwise.
+    """
+    if q:
+        plants, next_cursor = await search_plants_page(
+            q, settings.PAGE_SIZE, cursor, is_accepted=False
+        )  # TODO: Change to True
+        params = {"q": q}
+    else:
+        plants, next_cursor = await get_plants_page(
+            Plant.filter(is_accepted=False), settings.PAGE_SIZE, cursor, filters
+        )  # TODO: Change to True
+        params = jsonable_encoder(filters, exclude_defaults=True)
+    if not next_cursor:
+        return plants, None
+    return plants, f"/plant/cards?{urlencode({'cursor': next_cursor, **params})}"
+
+
 @router.get("/", status_code=200, response_class=HTMLResponse)
-async def plants_dashboard(context: dict = Depends(context_middleware)) -> HTMLResponse:
-    """Displays a list of all plants."""
-    plants = await Plant.filter(is_accepted=False).prefetch_related(
-        "image"
-    )  # TODO: Change to True
-    context["plants"] = plants
+async def plants_dashboard(
+    q: Optional[str] = None,
+    filters: PlantFilters = Depends(),
+    context: dict = Depends(context_middleware),
+) -> HTMLResponse:
+    """Displays the first page of plants, matching the search query or filters."""
+    context["plants"], context["next_url"] = await get_dashboard_page(q, filters)
+    context["query"] = q
+    context["filters"] = filters
+    context["conditions"] = list(Conditions)
+    context["sort_orders"] = list(PlantSort)
     return TemplateResponse("plants/dashboard.html", context)
 
 
+@router.get("/plant/cards", status_code=200, response_class=HTMLResponse)
+async def plants_dashboard_cards(
+    cursor: str,
+    q: Optional[str] = None,
+    filters: PlantFilters = Depends(),
+    context: dict = Depends(context_middleware),
+) -> HTMLResponse:
+    """Displays only the cards of the next dashboard page."""
+    context["plants"], context["next_url"] = await get_dashboard_page(
+        q, filters, cursor
+    )
+    return TemplateResponse("plants/cards.html", context)
+
+
 @router.get("/plants/{pk}", status_code=200, response_class=HTMLResponse)
 async def plant_details(
     pk: UUID, context: dict = Depends(context_middleware)
 ) -> HTMLResponse:
     """Displays a details of given plant if it exists."""
-    plant = await Plant.get_or_none(pk=pk)
-    if not plant:
-        return TemplateResponse("shared/404-page.html", context, 404)
-    await plant.fetch_related("creator", "image")
+    plant = plants_cache.get(("details", pk))
+    if plant is None:
+        plant = await Plant.get_or_none(pk=pk)
+        if not plant:
+            return TemplateResponse("shared/404-page.html", context, 404)
+        await plant.fetch_related("creator", "image")
+        plants_cache.set(("details", pk), plant)
     context["plant"] = plant
-    return TemplateResponse("plants/details.html", context)
+    response = TemplateResponse("plants/details.html", context)
+    return ConditionalResponse(context["request"], response)
 
 
 @router.get("/plant/create", status_code=200, response_class=HTMLResponse)
@@ -1,16 +1,26 @@
 from datetime import datetime, timezone
-from typing import Union
+from typing import Optional, Union
+from urllib.parse import urlencode
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 from starlette.requests import Request
 from starlette.responses import HTMLResponse, RedirectResponse
 
 from src.api.forms.users import PasswordChangeForm, UserCreateForm, UserLoginForm
+from src.api.middleware.authentication import cookie_scheme
 from src.api.middleware.context import context_middleware
-from src.api.middleware.response import TemplateResponse
+from src.api.middleware.rate_limit import credentials_rate_limit_middleware
+from src.api.middleware.response import (
+    ConditionalResponse,
+    ErrorResponse,
+    TemplateResponse,
+)
+from src.database.crud.plants import get_plants_page
 from src.database.models import Plant, User
 from src.services.jwt_token import JwtTokenService
+from src.settings import settings
 
 router = APIRouter(tags=["Users"], include_in_schema=False)
 
@@ -43,12 +53,19 @@ async def user_login_form(
 async def user_register(
     request: Request, form: UserCreateForm = Depends()
 ) -> HTMLResponse:
-    """Registers a user using form data and redirects to login form."""
-    await form.validate()
-    if form.errors:
-        context = {"request": request, "errors": form.errors}
-        return TemplateResponse("users/register.html", context, 422)
-    await form.create()
+    """Registers a user using form data and redirects to login form.
+
+    Rate limited and rejected requests render the form with the error.
+    """
+    try:
+        await credentials_rate_limit_middleware(request)
+        await form.validate()
+        if form.errors:
+            context = {"request": request, "errors": form.errors}
+            return TemplateResponse("users/register.html", context, 422)
+        await form.create()
+    except HTTPException as exception:
+        return ErrorResponse("users/register.html", {"request": request}, exception)
     context = {"request": request, "messages": ["You can now login into our app"]}
     return TemplateResponse("users/login.html", context, 201)
 
@@ -57,20 +74,33 @@ async def user_register(
 async def user_login(
     request: Request, form: UserLoginForm = Depends()
 ) -> Union[HTMLResponse, RedirectResponse]:
-    """Logs user in, saves the cookies and redirects to the dashboard"""
-    await form.validate()
+    """Logs user in, saves the cookies and redirects to the dashboard.
+
+    Rate limited and rejected requests render the form with the error.
+    """
+    try:
+        await credentials_rate_limit_middleware(request)
+        await form.validate()
+    except HTTPException as exception:
+        return ErrorResponse("users/login.html", {"request": request}, exception)
     if form.errors:
         context = {"request": request, "errors": form.errors}
         return TemplateResponse("users/login.html", context, 422)
-    token = JwtTokenService.encode_jwt(form.data["email"])
+    user = await form.lookups.get_or_none(User, email=form.data["email"])
+    token = JwtTokenService.encode_user_jwt(user)
     response = RedirectResponse("/", 302)
     response.set_cookie("access_token", f"Bearer {token.access_token}")
     return response
 
 
 @router.get("/logout", status_code=200, response_class=RedirectResponse)
-async def user_logout(request: Request) -> RedirectResponse:
-    """Clears the cookies and redirects to the dashboard."""
+async def user_logout(
+    request: Request,
+    token: Optional[HTTPAuthorizationCredentials] = Depends(cookie_scheme),
+) -> RedirectResponse:
+    """Revokes the token, clears the cookies and redirects to the dashboard."""
+    if token:
+        JwtTokenService.revoke_jwt(token.credentials)
     context = {
         "request": request,
         "messages": ["You have been logged out successfully"],
@@ -80,6 +110,21 @@ async def user_logout(request: Request) -> RedirectResponse:
     return response
 
 
+async def get_profile_page(
+    profile_user: User, cursor: Optional[str] = None
+) -> tuple[list[Plant], Optional[str]]:
+    """Retrieves a page of user plants and an url of the next page cards."""
+    plants, next_cursor = await get_plants_page(
+        Plant.filter(creator=profile_user), settings.PAGE_SIZE, cursor
+    )
+    if not next_cursor:
+        return plants, None
+    return (
+        plants,
+        f"/profile/{profile_user.pk}/plants?{urlencode({'cursor': next_cursor})}",
+    )
+
+
 @router.get("/profile/{pk}", status_code=200, response_class=HTMLResponse)
 async def user_profile(
     pk: UUID, context: dict = Depends(context_middleware)
@@ -88,13 +133,29 @@ async def user_profile(
     profile_user = await User.get_or_none(pk=pk)
     if not profile_user:
         return TemplateResponse("shared/404-page.html", context, 404)
-    plants = await Plant.filter(creator=profile_user).prefetch_related("image")
+    plants = Plant.filter(creator=profile_user)
     context["days_since_join"] = (
         datetime.now(timezone.utc) - profile_user.created_at
     ).days
     context["profile_user"] = profile_user
-    context["plants"] = plants
-    return TemplateResponse("users/profile.html", context)
+    context["plants_count"] = await plants.count()
+    context["plants"], context["next_url"] = await get_profile_page(profile_user)
+    response = TemplateResponse("users/profile.html", context)
+    return ConditionalResponse(context["request"], response)
+
+
+@router.get("/profile/{pk}/plants", status_code=200, response_class=HTMLResponse)
+async def user_profile_cards(
+    pk: UUID, cursor: str, context: dict = Depends(context_middleware)
+) -> HTMLResponse:
+    """Displays only the cards of the next user profile plants page."""
+    profile_user = await User.get_or_none(pk=pk)
+    if not profile_user:
+        return TemplateResponse("shared/404-page.html", context, 404)
+    context["plants"], context["next_url"] = await get_profile_page(
+        profile_user, cursor
+    )
+    return TemplateResponse("plants/cards.html", context)
 
 
 @router.post("/profile/{pk}", status_code=200, response_class=HTMLResponse)
@@ -136,18 +197,27 @@ async def change_password(
 ) -> HTMLResponse:
     """Changes user password using password change form
     and redirects back to the form.
+
+    Rate limited and rejected requests render the form with the error.
     """
     context = form.context
-    profile_user = await User.get_or_none(pk=pk)
-    if not profile_user:
-        return TemplateResponse("shared/404-page.html", context, 404)
-    user = context.get("user")
-    if not user or not user == profile_user:
-        return TemplateResponse("shared/403-page.html", context, 403)
-    await form.validate()
-    if form.errors:
-        context["errors"] = form.errors
-        return TemplateResponse("users/change_password.html", context, 422)
-    await form.update(profile_user)
+    try:
+        await credentials_rate_limit_middleware(context["request"])
+        profile_user = await User.get_or_none(pk=pk)
+        if not profile_user:
+            return TemplateResponse("shared/404-page.html", context, 404)
+        user = context.get("user")
+        if not user or not user == profile_user:
+            return TemplateResponse("shared/403-page.html", context, 403)
+        await form.validate()
+        if form.errors:
+            context["errors"] = form.errors
+            return TemplateResponse("users/change_password.html", context, 422)
+        await form.update(profile_user)
+    except HTTPException as exception:
+        return ErrorResponse("users/change_password.html", context, exception)
     context["messages"] = ["Password has been changed successfully!"]
-    return TemplateResponse("users/change_password.html", context, 200)
+    response = TemplateResponse("users/change_password.html", context, 200)
+    token = JwtTokenService.encode_user_jwt(profile_user)
+    response.set_cookie("access_token", f"Bearer {token.access_token}")
+    return response
@@ -1,12 +1,21 @@
+import importlib
+import logging
+import pkgutil
+from types import ModuleType
+
 from fastapi import FastAPI
 from pydantic import SecretStr
 from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
 from tortoise.contrib.fastapi import register_tortoise
+from tortoise.transactions import in_transaction
 
 from src.database.models import User
 from src.services.hashing import HashingService
 from src.settings import settings
 
+logger = logging.getLogger(__name__)
+
 """Tortoise settings."""
 TORTOISE_ORM = {
     "connections": {"default": settings.DATABASE_URL},
@@ -34,18 +43,65 @@ async def create_superuser() -> None:
     """Creates a starting superuser."""
     await User.get_or_create(
         email=settings.SUPERUSER_EMAIL,
-        hashed_password=HashingService.get_hashed_password(
+        hashed_password=await HashingService.get_hashed_password_async(
             SecretStr(settings.SUPERUSER_PASSWORD)
         ),
         is_superuser=True,
     )
 
 
-async def generate_schema() -> None:
-    """Generates database schemas with Tortoise."""
+"""Package with versioned migration modules."""
+MIGRATIONS_PACKAGE = "src.database.migrations"
+
+
+def load_migrations() -> list[ModuleType]:
+    """Imports all the migration modules, ordered by their versions."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    names = sorted(module.name for module in pkgutil.iter_modules(package.__path__))
+    return [importlib.import_module(f"{MIGRATIONS_PACKAGE}.{name}") for name in names]
+
+
+async def run_migration(
+    connection: BaseDBAsyncClient, name: str, statements: list[str]
+) -> None:
+    """Executes migration statements one by one and marks it as applied."""
+    for statement in statements:
+        await connection.execute_script(statement)
+    placeholder = "$1" if connection.capabilities.dialect == "postgres" else "?"
+    await connection.execute_query(
+        f'INSERT INTO "migration" ("name") VALUES ({placeholder})', [name]
+    )
+
+
+async def apply_migrations() -> list[str]:
+    """Applies all the migrations that were not applied yet.
+
+    Atomic migrations run in a transaction, the others run without it,
+    so they can e.g. build indexes concurrently. Returns applied migration names.
+    """
     await Tortoise.init(
         db_url=settings.DATABASE_URL,
         modules={"models": settings.APP_MODELS},
     )
-    await Tortoise.generate_schemas()
+    connection = Tortoise.get_connection("default")
+    await connection.execute_script(
+        'CREATE TABLE IF NOT EXISTS "migration" ('
+        '"name" VARCHAR(255) NOT NULL PRIMARY KEY, '
+        '"applied_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP)'
+    )
+    _, rows = await connection.execute_query('SELECT "name" FROM "migration"')
+    applied_names = {row["name"] for row in rows}
+    migrated = []
+    for migration in load_migrations():
+        name = migration.__name__.rsplit(".", 1)[-1]
+        if name in applied_names:
+            continue
+        logger.info(f"Applying {name} migration...")
+        if migration.atomic:
+            async with in_transaction("default") as transaction:
+                await run_migration(transaction, name, migration.upgrade)
+        else:
+            await run_migration(connection, name, migration.upgrade)
+        migrated.append(name)
     await Tortoise.close_connections()
+    return migrated
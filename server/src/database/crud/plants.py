@@ -1,10 +1,24 @@
+import json
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, UploadFile
+from tortoise import Tortoise
+from tortoise.queryset import QuerySet
 
 from src.database.models import Plant, User
-from src.schemas.plants import PlantCreate, PlantModel, PlantQuerySet
+from src.schemas.plants import (
+    PLANT_FIELDS,
+    PLANT_LIST_FIELDS,
+    PlantCreate,
+    PlantFilters,
+    PlantModel,
+    PlantSort,
+    plant_payload,
+)
+from src.services.cache import invalidate_plant_cache, plants_cache
 from src.services.images import ImageService
+from src.services.pagination import PaginationService
 
 
 async def create_plant(
@@ -15,22 +29,173 @@ async def create_plant(
     plant = await Plant.create(
         **payload.dict(), creator=user, image=image, is_accepted=False
     )
+    invalidate_plant_cache(plant.pk)
     plant_model = PlantModel.from_orm(plant)
     return plant_model
 
 
-async def get_all_plants() -> PlantQuerySet:
-    """Retrieves a list of all accepted plants."""
-    plants = Plant.filter(is_accepted=True)
-    plant_models = await PlantQuerySet.from_queryset(plants)
-    return plant_models
+def filter_plants(plants: QuerySet, filters: PlantFilters) -> QuerySet:
+    """Narrows the plants queryset down to the ones matching given filters."""
+    lookups = {
+        "temperature": filters.temperature,
+        "humidity": filters.humidity,
+        "creator_id": filters.creator,
+        "created_at__gt": filters.created_after,
+        "created_at__lt": filters.created_before,
+    }
+    return plants.filter(
+        **{lookup: value for lookup, value in lookups.items() if value is not None}
+    )
 
 
-async def get_plant(pk: UUID) -> PlantModel:
-    """Retrieves a single plant by its pk."""
-    plant = await get_plant_or_404(pk)
-    plant_model = PlantModel.from_orm(plant)
-    return plant_model
+def paginate_plants(
+    plants: QuerySet, filters: PlantFilters, limit: int, cursor: Optional[str] = None
+) -> QuerySet:
+    """Filters and orders the plants queryset, narrowing it to a single page."""
+    return PaginationService.paginate(
+        filter_plants(plants, filters),
+        limit,
+        cursor,
+        descending=filters.sort == PlantSort.newest,
+    )
+
+
+async def get_all_plants(
+    filters: PlantFilters, limit: int, cursor: Optional[str] = None
+) -> dict:
+    """Retrieves a single page of accepted plants, using the cache if possible.
+
+    Returned payload matches the PlantPage schema.
+    """
+    cache_key = ("plants", limit, cursor, *filters.dict().values())
+    plant_page = plants_cache.get(cache_key)
+    if plant_page is not None:
+        return plant_page
+    plants = paginate_plants(Plant.filter(is_accepted=True), filters, limit, cursor)
+    rows, next_cursor = PaginationService.split_page(
+        await plants.values(*PLANT_LIST_FIELDS), limit
+    )
+    plant_page = {"items": [plant_payload(row) for row in rows], "next": next_cursor}
+    plants_cache.set(cache_key, plant_page)
+    return plant_page
+
+
+async def stream_all_plants(
+    filters: PlantFilters, chunk_size: int
+) -> AsyncIterator[str]:
+    """Yields all accepted plants matching the filters as parts of a json array.
+
+    Plants are fetched chunk by chunk, so only one chunk is kept in memory.
+    """
+    yield "["
+    separator, cursor = "", None
+    while True:
+        plants = paginate_plants(
+            Plant.filter(is_accepted=True), filters, chunk_size, cursor
+        )
+        rows, cursor = PaginationService.split_page(
+            await plants.values(*PLANT_LIST_FIELDS), chunk_size
+        )
+        if rows:
+            yield separator + ",".join(json.dumps(plant_payload(row)) for row in rows)
+            separator = ","
+        if not cursor:
+            yield "]"
+            return
+
+
+"""Weighted plant search document, it has to match the idx_plant_search index."""
+PLANT_SEARCH_VECTOR = """
+    setweight(to_tsvector('english', "name"), 'A')
+    || setweight(to_tsvector('english', "description"), 'B')
+"""
+
+PLANT_SEARCH_QUERY = f"""
+    SELECT * FROM (
+        SELECT {", ".join(f'"{field}"' for field in PLANT_LIST_FIELDS)},
+            ts_rank({PLANT_SEARCH_VECTOR}, "query") AS "rank"
+        FROM "plant", websearch_to_tsquery('english', $1) AS "query"
+        WHERE "is_accepted" = $2 AND {PLANT_SEARCH_VECTOR} @@ "query"
+    ) AS "results"
+    WHERE $3::real IS NULL OR "rank" < $3 OR ("rank" = $3 AND "uuid" > $4)
+    ORDER BY "rank" DESC, "uuid"
+    LIMIT $5
+"""
+
+
+async def search_plant_rows(
+    query: str, limit: int, cursor: Optional[str] = None, is_accepted: bool = True
+) -> tuple[list[dict], Optional[str]]:
+    """Retrieves a page of plant rows matching the full text query,
+    best matches first, with a cursor pointing to the next page.
+    """
+    rank, uuid = None, None
+    if cursor:
+        rank, uuid = PaginationService.decode_rank_cursor(cursor)
+    _, rows = await Tortoise.get_connection("default").execute_query(
+        PLANT_SEARCH_QUERY, [query, is_accepted, rank, uuid, limit + 1]
+    )
+    rows = [dict(row) for row in rows]
+    if len(rows) <= limit:
+        return rows, None
+    last_row = rows[limit - 1]
+    next_cursor = PaginationService.encode_rank_cursor(
+        last_row["rank"], last_row["uuid"]
+    )
+    return rows[:limit], next_cursor
+
+
+async def search_plants(query: str, limit: int, cursor: Optional[str] = None) -> dict:
+    """Retrieves a page of accepted plants matching the full text query.
+
+    Returned payload matches the PlantPage schema.
+    """
+    rows, next_cursor = await search_plant_rows(query, limit, cursor)
+    items = [
+        plant_payload({field: row[field] for field in PLANT_LIST_FIELDS})
+        for row in rows
+    ]
+    return {"items": items, "next": next_cursor}
+
+
+async def search_plants_page(
+    query: str, limit: int, cursor: Optional[str] = None, is_accepted: bool = True
+) -> tuple[list[Plant], Optional[str]]:
+    """Retrieves a page of plant instances matching the full text query,
+    with their images prefetched.
+    """
+    rows, next_cursor = await search_plant_rows(query, limit, cursor, is_accepted)
+    positions = {row["uuid"]: position for position, row in enumerate(rows)}
+    plants = await Plant.filter(uuid__in=positions).prefetch_related("image")
+    plants.sort(key=lambda plant: positions[plant.uuid])
+    return plants, next_cursor
+
+
+async def get_plants_page(
+    plants: QuerySet,
+    limit: int,
+    cursor: Optional[str] = None,
+    filters: Optional[PlantFilters] = None,
+) -> tuple[list[Plant], Optional[str]]:
+    """Retrieves a single page of plant instances with their images prefetched."""
+    page = paginate_plants(plants, filters or PlantFilters(), limit, cursor)
+    return PaginationService.split_page(await page.prefetch_related("image"), limit)
+
+
+async def get_plant(pk: UUID) -> dict:
+    """Retrieves a single plant by its pk, using the cache if possible.
+
+    Returned payload matches the PlantModel schema.
+    """
+    plant = plants_cache.get(("plant", pk))
+    if plant is not None:
+        return plant
+    rows = await Plant.filter(pk=pk).values(*PLANT_FIELDS)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Plant does not exist")
+    plant = plant_payload(rows[0])
+    plants_cache.set(("plant", pk), plant)
+    return plant
 
 
 async def delete_plant(pk: UUID, user: User) -> bool:
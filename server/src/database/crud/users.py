@@ -1,10 +1,13 @@
 from fastapi import HTTPException
+from pydantic import SecretStr
 
 from src.database.models.users import User
 from src.schemas.jwt_token import JwtTokenEncoded
 from src.schemas.users import UserPayload
+from src.services.cache import invalidate_user_cache
 from src.services.hashing import HashingService
 from src.services.jwt_token import JwtTokenService
+from src.services.refresh_token import RefreshTokenService
 
 
 async def create_user(payload: UserPayload) -> JwtTokenEncoded:
@@ -16,10 +19,11 @@ async def create_user(payload: UserPayload) -> JwtTokenEncoded:
         )
     user = await User.create(
         email=payload.email,
-        hashed_password=HashingService.get_hashed_password(payload.password),
+        hashed_password=await HashingService.get_hashed_password_async(
+            payload.password
+        ),
     )
-    token = JwtTokenService.encode_jwt(user.email)
-    return token
+    return await issue_user_tokens(user)
 
 
 async def authenticate_user(payload: UserPayload) -> JwtTokenEncoded:
@@ -27,6 +31,38 @@ async def authenticate_user(payload: UserPayload) -> JwtTokenEncoded:
     user = await User.get_or_none(email=payload.email)
     if not user:
         raise HTTPException(status_code=401, detail="User does not exist")
-    if not HashingService.verify_password(payload.password, user.hashed_password):
+    if not await verify_user_password(user, payload.password):
         raise HTTPException(status_code=401, detail="Wrong email or password")
-    return JwtTokenService.encode_jwt(user.email)
+    return await issue_user_tokens(user)
+
+
+async def issue_user_tokens(user: User) -> JwtTokenEncoded:
+    """Returns a new access token along with a refresh token from a new family."""
+    token = JwtTokenService.encode_user_jwt(user)
+    token.refresh_token = await RefreshTokenService.issue(user)
+    return token
+
+
+async def refresh_user_tokens(refresh_token: str) -> JwtTokenEncoded:
+    """Rotates the refresh token and returns it with a new access token,
+    so clients stay logged in without sending the password again.
+    """
+    user, rotated_token = await RefreshTokenService.rotate(refresh_token)
+    token = JwtTokenService.encode_user_jwt(user)
+    token.refresh_token = rotated_token
+    return token
+
+
+async def verify_user_password(user: User, password: SecretStr) -> bool:
+    """Checks the users password, upgrading the stored hash if it's outdated.
+
+    Hash is updated in bulk, so users tokens are not revoked by the upgrade.
+    """
+    is_valid, updated_hash = await HashingService.verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if updated_hash:
+        user.hashed_password = updated_hash
+        await User.filter(pk=user.pk).update(hashed_password=updated_hash)
+        invalidate_user_cache(user.email)
+    return is_valid
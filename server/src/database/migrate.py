@@ -1,6 +1,6 @@
 from tortoise import run_async
 
-from src.database.config import generate_schema
+from src.database.config import apply_migrations
 
 if __name__ == "__main__":
-    run_async(generate_schema())
+    run_async(apply_migrations())
@@ -0,0 +1,45 @@
+"""Tables created previously with Tortoise generate_schemas."""
+
+atomic = True
+
+upgrade = [
+    """
+    CREATE TABLE IF NOT EXISTS "image" (
+        "uuid" UUID NOT NULL PRIMARY KEY,
+        "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        "name" VARCHAR(127) NOT NULL,
+        "path" VARCHAR(255) NOT NULL
+    )
+    """,
+    """COMMENT ON TABLE "image" IS 'Model containing info about the image file.'""",
+    """
+    CREATE TABLE IF NOT EXISTS "user" (
+        "uuid" UUID NOT NULL PRIMARY KEY,
+        "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        "email" VARCHAR(127) NOT NULL UNIQUE,
+        "hashed_password" VARCHAR(127) NOT NULL,
+        "is_superuser" BOOL NOT NULL DEFAULT False
+    )
+    """,
+    """COMMENT ON TABLE "user" IS 'Model for storing users data.'""",
+    """
+    CREATE TABLE IF NOT EXISTS "plant" (
+        "uuid" UUID NOT NULL PRIMARY KEY,
+        "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        "name" VARCHAR(63) NOT NULL,
+        "description" TEXT NOT NULL,
+        "temperature" VARCHAR(7) NOT NULL,
+        "humidity" VARCHAR(7) NOT NULL,
+        "is_accepted" BOOL NOT NULL DEFAULT False,
+        "creator_id" UUID NOT NULL REFERENCES "user" ("uuid") ON DELETE CASCADE,
+        "image_id" UUID NOT NULL UNIQUE REFERENCES "image" ("uuid") ON DELETE CASCADE
+    )
+    """,
+    r"""
+    COMMENT ON COLUMN "plant"."temperature" IS 'low: low\naverage: average\nhigh: high'
+    """,
+    r"""
+    COMMENT ON COLUMN "plant"."humidity" IS 'low: low\naverage: average\nhigh: high'
+    """,
+    """COMMENT ON TABLE "plant" IS 'Model for storing plants data.'""",
+]
@@ -0,0 +1,30 @@
+"""Indexes matching the plant lists keyset queries.
+
+* accepted plants - `WHERE is_accepted ORDER BY created_at, uuid` (api list),
+* not accepted plants - `WHERE NOT is_accepted ORDER BY created_at, uuid` (dashboard),
+* users plants - `WHERE creator_id = $1 ORDER BY created_at, uuid` (profile),
+  it also backs the foreign key, which postgres doesn't index on its own.
+
+Indexes are built concurrently, so the plant table stays writable meanwhile.
+Each one is dropped first, in case an invalid index was left by a failed build.
+"""
+
+atomic = False
+
+upgrade = [
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_accepted_created"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_accepted_created"
+    ON "plant" ("created_at", "uuid") WHERE "is_accepted"
+    """,
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_pending_created"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_pending_created"
+    ON "plant" ("created_at", "uuid") WHERE NOT "is_accepted"
+    """,
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_creator_created"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_creator_created"
+    ON "plant" ("creator_id", "created_at", "uuid")
+    """,
+]
@@ -0,0 +1,17 @@
+"""GIN index over the weighted plant search document.
+
+Indexed expression has to stay the same as PLANT_SEARCH_VECTOR used by the
+search query, otherwise postgres falls back to a sequential scan.
+"""
+
+atomic = False
+
+upgrade = [
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_search"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_search" ON "plant" USING GIN ((
+        setweight(to_tsvector('english', "name"), 'A')
+        || setweight(to_tsvector('english', "description"), 'B')
+    ))
+    """,
+]
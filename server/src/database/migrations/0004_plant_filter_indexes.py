@@ -0,0 +1,25 @@
+"""Indexes matching the filtered accepted plant lists.
+
+* both conditions - `WHERE is_accepted AND temperature = $1 AND humidity = $2
+  ORDER BY created_at, uuid`, temperature alone is narrowed by its first column,
+* humidity - `WHERE is_accepted AND humidity = $1 ORDER BY created_at, uuid`.
+
+Creator filter is backed by idx_plant_creator_created and created_at ranges
+by idx_plant_accepted_created. Newest first order scans the same indexes
+backwards, so no descending ones are needed.
+"""
+
+atomic = False
+
+upgrade = [
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_accepted_conditions"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_accepted_conditions"
+    ON "plant" ("temperature", "humidity", "created_at", "uuid") WHERE "is_accepted"
+    """,
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_plant_accepted_humidity"',
+    """
+    CREATE INDEX CONCURRENTLY "idx_plant_accepted_humidity"
+    ON "plant" ("humidity", "created_at", "uuid") WHERE "is_accepted"
+    """,
+]
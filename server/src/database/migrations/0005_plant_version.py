@@ -0,0 +1,10 @@
+"""Plant version, bumped on every edit and used in the card fragment cache keys.
+
+Adding a column with a constant default doesn't rewrite the table.
+"""
+
+atomic = True
+
+upgrade = [
+    'ALTER TABLE "plant" ADD COLUMN IF NOT EXISTS "version" INT NOT NULL DEFAULT 1',
+]
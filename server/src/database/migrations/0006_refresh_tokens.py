@@ -0,0 +1,26 @@
+"""Refresh tokens table, tokens are looked up by their hash and revoked by family."""
+
+atomic = True
+
+upgrade = [
+    """
+    CREATE TABLE IF NOT EXISTS "refreshtoken" (
+        "uuid" UUID NOT NULL PRIMARY KEY,
+        "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        "token_hash" VARCHAR(64) NOT NULL UNIQUE,
+        "family" UUID NOT NULL,
+        "expires_at" TIMESTAMPTZ NOT NULL,
+        "is_used" BOOL NOT NULL DEFAULT False,
+        "is_revoked" BOOL NOT NULL DEFAULT False,
+        "user_id" UUID NOT NULL REFERENCES "user" ("uuid") ON DELETE CASCADE
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS "idx_refreshtok_family" ON "refreshtoken" ("family")',
+    """
+    CREATE INDEX IF NOT EXISTS "idx_refreshtok_user_id"
+    ON "refreshtoken" ("user_id", "expires_at")
+    """,
+    """
+    COMMENT ON TABLE "refreshtoken" IS 'Model for storing hashed refresh tokens.'
+    """,
+]
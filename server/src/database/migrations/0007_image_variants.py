@@ -0,0 +1,12 @@
+"""Resized image variants, filled in by the derivatives pipeline after the upload.
+
+Adding a column with a constant default doesn't rewrite the table.
+"""
+
+atomic = True
+
+upgrade = [
+    """
+    ALTER TABLE "image" ADD COLUMN IF NOT EXISTS "variants" JSONB NOT NULL DEFAULT '[]'
+    """,
+]
@@ -0,0 +1,13 @@
+"""Content digest of the image files, images with the same digest share the file.
+
+Index backs the lookups of the stored file and its reference count.
+It's built concurrently, so the image table stays writable meanwhile.
+"""
+
+atomic = False
+
+upgrade = [
+    'ALTER TABLE "image" ADD COLUMN IF NOT EXISTS "digest" VARCHAR(64)',
+    'DROP INDEX CONCURRENTLY IF EXISTS "idx_image_digest"',
+    'CREATE INDEX CONCURRENTLY "idx_image_digest" ON "image" ("digest")',
+]
@@ -0,0 +1,10 @@
+"""Versioned database migrations.
+
+Every module is named `<version>_<description>` and defines:
+
+* `upgrade` - list of sql statements, executed in order,
+* `atomic` - if statements should run in a single transaction. It has to be
+  disabled for statements which can't run inside one, like concurrent index builds.
+
+Non atomic migrations should be safe to run again after a partial failure.
+"""
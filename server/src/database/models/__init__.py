@@ -1,3 +1,4 @@
 from .images import Image  # noqa
 from .plants import Plant  # noqa
+from .tokens import RefreshToken  # noqa
 from .users import User  # noqa
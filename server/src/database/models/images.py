@@ -1,8 +1,7 @@
-import shutil
-
 from tortoise import fields
 
 from src.database.models.generic import GenericModel
+from src.services.garbage import file_collector
 
 
 class Image(GenericModel):
@@ -10,9 +9,35 @@ class Image(GenericModel):
 
     name = fields.CharField(max_length=127)
     path = fields.CharField(max_length=255)
+    digest = fields.CharField(max_length=64, null=True, index=True)
+    variants = fields.JSONField(default=list)
+
+    @property
+    def file_paths(self) -> list[str]:
+        """Static paths of the image file and its variants."""
+        return [self.path, *(variant["path"] for variant in self.variants)]
 
     async def delete(self, *args, **kwargs) -> None:
-        """Deletes the image instance and connected image file."""
-        if shutil.which(self.path):
-            shutil.rmtree(self.path)
+        """Deletes the image instance and collects its files."""
         await super().delete(*args, **kwargs)
+        await self.collect_files([self])
+
+    @classmethod
+    async def collect_files(cls, images: list["Image"]) -> None:
+        """Hands the files of deleted images over to the collector,
+        unless they are shared with the remaining ones.
+
+        Images uploaded before the content addressing have files of their own.
+        """
+        digests = {image.digest for image in images if image.digest}
+        shared = set(
+            await cls.filter(digest__in=digests).values_list("digest", flat=True)
+        )
+        file_collector.enqueue(
+            *(
+                path
+                for image in images
+                if image.digest not in shared
+                for path in image.file_paths
+            )
+        )
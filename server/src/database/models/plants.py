@@ -2,6 +2,7 @@ from tortoise import fields
 
 from src.database.models.enums import Conditions
 from src.database.models.generic import GenericModel
+from src.services.cache import invalidate_plant_cache
 
 
 class Plant(GenericModel):
@@ -12,6 +13,7 @@ class Plant(GenericModel):
     temperature = fields.CharEnumField(Conditions)
     humidity = fields.CharEnumField(Conditions)
     is_accepted = fields.BooleanField(default=False)
+    version = fields.IntField(default=1)
 
     """Relational fields."""
     creator = fields.ForeignKeyField(
@@ -24,7 +26,8 @@ class Plant(GenericModel):
     # TODO: Category, Image, Rating, Difficulty
 
     async def delete(self, *args, **kwargs) -> None:
-        """Deletes the connected image instance."""
+        """Deletes the connected image instance and drops cached plant reads."""
         await self.fetch_related("image")
         await self.image.delete()
         await super().delete(*args, **kwargs)
+        invalidate_plant_cache(self.pk)
@@ -0,0 +1,20 @@
+from tortoise import fields
+
+from src.database.models.generic import GenericModel
+
+
+class RefreshToken(GenericModel):
+    """Model for storing hashed refresh tokens.
+
+    Tokens rotated out of each other share the family, so reusing any of them
+    revokes the whole chain.
+    """
+
+    token_hash = fields.CharField(max_length=64, unique=True)
+    family = fields.UUIDField(index=True)
+    expires_at = fields.DatetimeField()
+    is_used = fields.BooleanField(default=False)
+    is_revoked = fields.BooleanField(default=False)
+    user = fields.ForeignKeyField(
+        "models.User", related_name="refresh_tokens", on_delete=fields.CASCADE
+    )
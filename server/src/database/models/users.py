@@ -1,6 +1,9 @@
 from tortoise import fields
 
 from src.database.models.generic import GenericModel
+from src.database.models.images import Image
+from src.services.cache import invalidate_plant_cache, invalidate_user_cache
+from src.services.revocation import token_revocations
 
 
 class User(GenericModel):
@@ -11,3 +14,29 @@ class User(GenericModel):
     is_superuser = fields.BooleanField(default=False)
 
     # TODO: Nickname, Profile Picture, Is Active
+
+    async def save(self, *args, **kwargs) -> None:
+        """Saves the user and drops its cached instance,
+        so password and superuser changes are visible right away.
+
+        Tokens issued before the update get revoked, as their claims are outdated.
+        """
+        is_update = self._saved_in_db
+        await super().save(*args, **kwargs)
+        invalidate_user_cache(self.email)
+        if is_update:
+            token_revocations.revoke_user(self.email)
+
+    async def delete(self, *args, **kwargs) -> None:
+        """Deletes the user, revokes its tokens and drops its cached instance
+        and cached plant reads, as users plants are getting deleted along with the user.
+
+        Images of the plants aren't cascaded, so they're deleted here.
+        """
+        images = await Image.filter(plant__creator_id=self.pk)
+        await super().delete(*args, **kwargs)
+        await Image.filter(pk__in=[image.pk for image in images]).delete()
+        await Image.collect_files(images)
+        invalidate_user_cache(self.email)
+        token_revocations.revoke_user(self.email)
+        invalidate_plant_cache()
@@ -3,11 +3,17 @@ import logging
 from fastapi import FastAPI
 from starlette.staticfiles import StaticFiles
 
+from src.api.middleware.response import precompile_templates
+from src.api.v1.admin.cache import router as cache_api_router
+from src.api.v1.admin.hashing import router as hashing_api_router
 from src.api.v1.admin.plants import router as plants_api_router
 from src.api.v1.admin.users import router as users_api_router
+from src.api.v1.app.images import router as images_router
 from src.api.v1.app.plants import router as plants_jinja_router
 from src.api.v1.app.users import router as users_jinja_router
 from src.database.config import init_database
+from src.services.derivatives import derivatives_pipeline
+from src.services.garbage import file_collector
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -17,13 +23,18 @@ def include_routers(application: FastAPI):
     """Adds the api and jinja routers."""
     application.include_router(users_api_router)
     application.include_router(plants_api_router)
+    application.include_router(cache_api_router)
+    application.include_router(hashing_api_router)
     application.include_router(users_jinja_router)
     application.include_router(plants_jinja_router)
+    application.include_router(images_router)
 
 
 def configure_static(application: FastAPI):
     """Prepares a folder with the static files."""
-    application.mount("/static", StaticFiles(directory="static"), name="static")
+    application.mount(
+        "/static", StaticFiles(directory=settings.STATIC_DIR), name="static"
+    )
 
 
 def create_application() -> FastAPI:
@@ -44,9 +55,13 @@ app = create_application()
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up...")
+    precompile_templates()
     init_database(app)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down...")
+    await derivatives_pipeline.wait()
+    derivatives_pipeline.shutdown()
+    await file_collector.wait()
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    """Counters of a single in-memory cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    max_size: int
+
+
+class CachesStats(BaseModel):
+    """Counters of all the in-memory caches."""
+
+    plants: CacheStats
+    fragments: CacheStats
+    tokens: CacheStats
+    users: CacheStats
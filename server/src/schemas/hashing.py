@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HashingStats(BaseModel):
+    """Queue depth and counters of the hashing pool."""
+
+    queued: int
+    running: int
+    completed: int
+    max_queued: int
+    rejected: int
+    max_workers: int
+    max_pending: Optional[int]
@@ -0,0 +1,9 @@
+import enum
+
+
+class ImageFormat(str, enum.Enum):
+    """Enum for defining formats of the resized images."""
+
+    jpeg = "jpeg"
+    png = "png"
+    webp = "webp"
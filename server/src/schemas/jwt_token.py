@@ -1,14 +1,35 @@
+from typing import Optional
+from uuid import UUID
+
 from pydantic import BaseModel, EmailStr
 
 
 class JwtTokenEncoded(BaseModel):
-    """Base jwt token schema."""
+    """Base jwt token schema.
+
+    Refresh token is returned only along with the login and registration.
+    """
 
     access_token: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenPayload(BaseModel):
+    """Payload needed for refreshing or revoking the refresh token."""
+
+    refresh_token: str
 
 
 class JwtTokenDecoded(BaseModel):
-    """Payload from decoded jwt token."""
+    """Payload from decoded jwt token.
+
+    Tokens issued before the user claims were added, have only the email and expiry.
+    """
 
     email: EmailStr
     expires: float
+    issued: Optional[float] = None
+    token_id: Optional[str] = None
+    uuid: Optional[UUID] = None
+    is_superuser: Optional[bool] = None
+    version: int = 1
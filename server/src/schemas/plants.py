@@ -1,3 +1,8 @@
+import enum
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
 from pydantic import BaseModel
 from tortoise.contrib.pydantic import pydantic_queryset_creator
 
@@ -25,4 +30,55 @@ class PlantModel(BaseOrmModel, PlantCreate):
 
 
 """List of plant payloads."""
-PlantQuerySet = pydantic_queryset_creator(Plant, exclude=("description", "is_accepted"))
+PlantQuerySet = pydantic_queryset_creator(
+    Plant, exclude=("description", "is_accepted", "version")
+)
+
+
+class PlantPage(BaseModel):
+    """Single page of plant payloads with a cursor pointing to the next one."""
+
+    items: PlantQuerySet
+    next: Optional[str]
+
+
+class PlantSort(str, enum.Enum):
+    """Enum for defining plant lists order."""
+
+    oldest = "oldest"
+    newest = "newest"
+
+
+class PlantFilters(BaseModel):
+    """Optional plant list filters and order, read from the query parameters."""
+
+    temperature: Optional[Conditions] = None
+    humidity: Optional[Conditions] = None
+    creator: Optional[UUID] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    sort: PlantSort = PlantSort.oldest
+
+
+"""Columns needed for building plant payloads straight from the db rows."""
+PLANT_LIST_FIELDS = ("uuid", "created_at", "name", "temperature", "humidity")
+PLANT_FIELDS = PLANT_LIST_FIELDS + ("description", "is_accepted", "creator_id")
+
+
+def plant_payload(row: dict) -> dict:
+    """Builds a json ready plant payload from the row fetched with values().
+
+    It's the fast path for hot reads, skipping the orm instances
+    and pydantic validation. Depending on the fetched columns,
+    output matches either PlantModel or a single PlantQuerySet item.
+    """
+    payload = {
+        **row,
+        "uuid": str(row["uuid"]),
+        "created_at": row["created_at"].isoformat(),
+        "temperature": Conditions(row["temperature"]).value,
+        "humidity": Conditions(row["humidity"]).value,
+    }
+    if "creator_id" in payload:
+        payload["creator"] = {"uuid": str(payload.pop("creator_id"))}
+    return payload
@@ -17,3 +17,14 @@ class UserModelUuid(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class TokenUser(BaseModel):
+    """User identity read from the jwt token claims."""
+
+    uuid: UUID
+    email: EmailStr
+    is_superuser: bool
+
+    class Config:
+        orm_mode = True
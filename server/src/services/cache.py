@@ -0,0 +1,266 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from itertools import islice
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from src.settings import settings
+
+
+class TTLCache:
+    """In-memory cache with time to live and least recently used eviction.
+
+    Keys are tuples with a namespace as the first element,
+    so related entries can be dropped together.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """Initializes an empty storage and zeroed counters."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Returns a fresh value stored under the key or none."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: tuple, value: Any) -> None:
+        """Stores the value and evicts the least recently used entry if it's full."""
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: tuple) -> None:
+        """Drops a single entry if it exists."""
+        self.entries.pop(key, None)
+
+    def delete_namespace(self, namespace: str) -> None:
+        """Drops all the entries which keys start with given namespace."""
+        for key in [key for key in self.entries if key[0] == namespace]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        """Drops all the entries, counters are left untouched."""
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the counters needed for sizing the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+        }
+
+
+def scan_files(directory: str) -> list[tuple[str, int]]:
+    """Returns names and sizes of the complete files stored in the directory,
+    the least recently modified ones first.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with os.scandir(directory) as entries:
+        files = [
+            entry
+            for entry in entries
+            if entry.is_file() and not entry.name.endswith(".part")
+        ]
+    files.sort(key=lambda entry: entry.stat().st_mtime)
+    return [(entry.name, entry.stat().st_size) for entry in files]
+
+
+def remove_files(locations: list[str]) -> None:
+    """Removes the files, skipping the missing ones."""
+    for location in locations:
+        with suppress(FileNotFoundError):
+            os.remove(location)
+
+
+class DiskLRUCache:
+    """Size bounded cache of files in a directory, with least recently used eviction.
+
+    Index of the entries and their sizes is kept in memory. It's built from
+    the directory on first use, so files cached by previous runs are reused,
+    the least recently modified ones being evicted first. Directory is scanned
+    and evicted files are removed in a worker thread, so the event loop isn't
+    blocked. Entries returned within the lease time aren't evicted, so the files
+    being served don't disappear, even if the cache goes over its size meanwhile.
+    """
+
+    def __init__(self, directory: str, max_size: int, lease_time: float):
+        """Initializes an empty index and zeroed counters."""
+        self.directory = directory
+        self.max_size = max_size
+        self.lease_time = lease_time
+        self.entries: OrderedDict[str, int] = OrderedDict()
+        self.leases: dict[str, float] = {}
+        self.removals: dict[str, asyncio.Future] = {}
+        self.size = 0
+        self.is_loaded = False
+        self.loading: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def load(self) -> None:
+        """Builds the index out of the stored files, unless it's built already."""
+        if self.is_loaded:
+            return
+        if self.loading is None:
+            self.loading = asyncio.get_running_loop().run_in_executor(
+                None, scan_files, self.directory
+            )
+        files = await asyncio.shield(self.loading)
+        if self.is_loaded:
+            return
+        for name, size in files:
+            self.entries[name] = size
+            self.size += size
+        self.is_loaded = True
+        self.loading = None
+        await self.evict()
+
+    async def location(self, name: str) -> str:
+        """Returns the location to store the file under the name at,
+        once its previously evicted file is removed.
+        """
+        await self.load()
+        if name in self.removals:
+            await asyncio.shield(self.removals[name])
+        return os.path.join(self.directory, name)
+
+    async def get(self, name: str) -> Optional[str]:
+        """Returns the location of the cached file, leasing it, or none."""
+        await self.load()
+        if name not in self.entries:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(name)
+        self.leases[name] = time.monotonic() + self.lease_time
+        self.hits += 1
+        return os.path.join(self.directory, name)
+
+    async def add(self, name: str, size: int) -> str:
+        """Indexes the file of given size written under the name, leasing it,
+        and evicts the least recently used ones if the cache is full.
+        """
+        await self.load()
+        self.size -= self.entries.pop(name, 0)
+        self.entries[name] = size
+        self.size += size
+        self.leases[name] = time.monotonic() + self.lease_time
+        await self.evict()
+        return os.path.join(self.directory, name)
+
+    async def evict(self) -> None:
+        """Removes the least recently used files until the cache fits its size.
+
+        Leased files and the most recent one are kept, even if the cache
+        doesn't fit its size without them.
+        """
+        now = time.monotonic()
+        size = self.size
+        evicted = []
+        for name, entry_size in islice(
+            self.entries.items(), max(len(self.entries) - 1, 0)
+        ):
+            if size <= self.max_size:
+                break
+            if self.leases.get(name, 0) > now:
+                continue
+            evicted.append(name)
+            size -= entry_size
+        if not evicted:
+            return
+        for name in evicted:
+            del self.entries[name]
+            self.leases.pop(name, None)
+        self.size = size
+        self.evictions += len(evicted)
+        removal = asyncio.get_running_loop().run_in_executor(
+            None,
+            remove_files,
+            [os.path.join(self.directory, name) for name in evicted],
+        )
+        self.removals.update(dict.fromkeys(evicted, removal))
+        try:
+            await removal
+        finally:
+            for name in evicted:
+                del self.removals[name]
+
+    def clear(self) -> None:
+        """Removes all the cached files, counters are left untouched."""
+        remove_files([os.path.join(self.directory, name) for name in self.entries])
+        self.entries.clear()
+        self.leases.clear()
+        self.size = 0
+
+
+"""Cache for plant reads, shared by the api and jinja views."""
+plants_cache = TTLCache(settings.PLANTS_CACHE_SIZE, settings.PLANTS_CACHE_TTL)
+
+"""Cache for rendered html fragments.
+
+Keys contain the version of rendered object, so the entries don't need
+to be invalidated, outdated ones just stop being read and get evicted.
+"""
+fragments_cache = TTLCache(settings.FRAGMENTS_CACHE_SIZE, settings.FRAGMENTS_CACHE_TTL)
+
+"""Cache for verified jwt token payloads, keyed by the token hashes."""
+tokens_cache = TTLCache(settings.TOKENS_CACHE_SIZE, settings.TOKENS_CACHE_TTL)
+
+"""Cache for users resolved from the tokens, keyed by their emails.
+
+Time to live is kept short, as bulk updates skip the invalidation.
+"""
+users_cache = TTLCache(settings.USERS_CACHE_SIZE, settings.USERS_CACHE_TTL)
+
+"""Cache for images resized on demand, keyed by the image digest and requested size.
+
+Image files are never changed in place, so the entries don't need to be invalidated.
+"""
+resized_images_cache = DiskLRUCache(
+    settings.RESIZED_IMAGES_CACHE_DIR,
+    settings.RESIZED_IMAGES_CACHE_SIZE,
+    settings.RESIZED_IMAGES_LEASE_TIME,
+)
+
+
+def invalidate_plant_cache(pk: Optional[UUID] = None) -> None:
+    """Drops cached reads of given plant and all the cached plant lists.
+
+    Without the pk, whole plants cache gets cleared.
+    """
+    if pk is None:
+        return plants_cache.clear()
+    plants_cache.delete(("plant", pk))
+    plants_cache.delete(("details", pk))
+    plants_cache.delete_namespace("plants")
+
+
+def invalidate_user_cache(email: str) -> None:
+    """Drops the cached user with given email."""
+    users_cache.delete(("user", email))
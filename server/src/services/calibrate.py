@@ -0,0 +1,22 @@
+import argparse
+
+from src.services.hashing import CALIBRATED_COSTS, HashingService
+from src.settings import settings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Picks hashing costs matching the target verification time."
+    )
+    parser.add_argument(
+        "--target", type=float, default=0.25, help="verification time in seconds"
+    )
+    parser.add_argument(
+        "--schemes",
+        nargs="+",
+        choices=CALIBRATED_COSTS,
+        default=settings.HASHING_SCHEMES,
+    )
+    arguments = parser.parse_args()
+    for scheme in arguments.schemes:
+        setting, cost, elapsed = HashingService.calibrate(scheme, arguments.target)
+        print(f"{setting}={cost}  # {scheme} verification takes {elapsed:.3f}s")
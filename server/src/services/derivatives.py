@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from PIL import Image as PILImage
+from PIL import ImageOps
+from tortoise.expressions import F
+
+from src.database.models import Image, Plant
+from src.services.cache import invalidate_plant_cache
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def save_image(image: PILImage.Image, location: str, image_format: str) -> None:
+    """Saves the image in given format, keeping the transparency if it allows it.
+
+    File is written to a temporary one first, so only a complete image is visible.
+    Temporary name is unique, as identical uploads may render the same file at once.
+    """
+    temp_location = f"{location}.{uuid.uuid4().hex}.part"
+    mode = "RGBA" if "A" in image.getbands() else "RGB"
+    if image_format == "jpeg":
+        mode = "RGB"
+    image.convert(mode).save(
+        temp_location,
+        format=image_format.upper(),
+        quality=settings.IMAGE_VARIANT_QUALITY,
+    )
+    os.replace(temp_location, location)
+
+
+def render_variants(source: str, widths: list[int], formats: list[str]) -> list[dict]:
+    """Saves resized copies of the source image next to it and returns them.
+
+    It runs in the worker process. Images are never upscaled and formats
+    which Pillow can't save are skipped.
+    """
+    PILImage.init()
+    stem = os.path.splitext(source)[0]
+    variants = []
+    with PILImage.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        for width in sorted(widths):
+            if width >= original.width:
+                continue
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), PILImage.LANCZOS)
+            for image_format in formats:
+                if image_format.upper() not in PILImage.SAVE:
+                    continue
+                location = f"{stem}-{width}.{image_format}"
+                save_image(resized, location, image_format)
+                variants.append(
+                    {
+                        "name": os.path.basename(location),
+                        "width": width,
+                        "format": image_format,
+                    }
+                )
+    return variants
+
+
+def render_resized(
+    source: str,
+    destination: str,
+    width: Optional[int],
+    height: Optional[int],
+    image_format: str,
+) -> int:
+    """Saves the source image fitted into given box at the destination
+    and returns the size of the saved file.
+
+    It runs in the worker process. Missing dimension doesn't limit the size
+    and images are never upscaled.
+    """
+    PILImage.init()
+    with PILImage.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail(
+            (width or image.width, height or image.height), PILImage.LANCZOS
+        )
+        save_image(image, destination, image_format)
+    return os.path.getsize(destination)
+
+
+class DerivativesPipeline:
+    """Creates resized variants of uploaded images in the background.
+
+    Resizing is cpu heavy, so it runs in a process pool, which is also used
+    for resizing images on demand. Until the variants
+    are recorded on the image, templates fall back to the original file.
+    """
+
+    def __init__(self, max_workers: int):
+        """Initializes the pipeline, the pool is started with the first image."""
+        self.max_workers = max_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    async def run(self, function: Callable, *args: Any) -> Any:
+        """Runs the function in one of the worker processes."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
+
+    def schedule(self, image: Image, file_location: str) -> None:
+        """Starts creating the variants of the image stored at given location."""
+        task = asyncio.create_task(self.create(image, file_location))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def create(self, image: Image, file_location: str) -> None:
+        """Renders the variants and records them on the image.
+
+        Version of the plant showing the image is bumped and its cached reads
+        are dropped, so its card and details get rendered again with the variants.
+        """
+        try:
+            variants = await self.run(
+                render_variants,
+                file_location,
+                settings.IMAGE_VARIANT_WIDTHS,
+                settings.IMAGE_VARIANT_FORMATS,
+            )
+        except Exception:
+            logger.exception("Creating variants of %s failed", image.path)
+            return
+        folder = os.path.dirname(image.path)
+        image.variants = [
+            {
+                "path": f"{folder}/{variant['name']}",
+                "width": variant["width"],
+                "format": variant["format"],
+            }
+            for variant in variants
+        ]
+        await image.save(update_fields=["variants"])
+        plant_pks = await Plant.filter(image_id=image.pk).values_list("uuid", flat=True)
+        await Plant.filter(uuid__in=plant_pks).update(version=F("version") + 1)
+        for plant_pk in plant_pks:
+            invalidate_plant_cache(plant_pk)
+
+    async def wait(self) -> None:
+        """Waits until all the scheduled images are processed."""
+        await asyncio.gather(*self.tasks)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+"""Pipeline shared by all the image uploads."""
+derivatives_pipeline = DerivativesPipeline(settings.IMAGE_WORKERS)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import time
+from itertools import islice
+from typing import Optional
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FileCollector:
+    """Removes files of deleted images in the background, in batches.
+
+    Files are removed in a worker thread, so the event loop isn't blocked,
+    and paths enqueued while a batch is being removed make up the next one.
+    File modified shortly before it was enqueued is kept, as an upload
+    of identical content may be reusing it, the reconciliation reclaims it later.
+    """
+
+    def __init__(self, batch_size: int, grace_period: float):
+        """Initializes an empty queue and zeroed counters."""
+        self.batch_size = batch_size
+        self.grace_period = grace_period
+        self.pending: dict[str, float] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.removed = 0
+        self.skipped = 0
+
+    def enqueue(self, *paths: str) -> None:
+        """Queues the static files for removal and starts the worker if it's idle.
+
+        Paths outside of the static folder are ignored.
+        """
+        enqueued_at = time.time()
+        for path in paths:
+            if path.startswith("/static/"):
+                self.pending.setdefault(path, enqueued_at)
+        if self.pending and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self.collect())
+
+    async def collect(self) -> None:
+        """Removes the queued files batch by batch, until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            batch = dict(islice(self.pending.items(), self.batch_size))
+            for path in batch:
+                del self.pending[path]
+            removed = await loop.run_in_executor(None, self.remove_files, batch)
+            self.removed += removed
+            self.skipped += len(batch) - removed
+
+    def remove_files(self, batch: dict[str, float]) -> int:
+        """Removes the files which weren't modified recently, returns their number.
+
+        It runs in the worker thread. Missing files are skipped.
+        """
+        removed = 0
+        for path, enqueued_at in batch.items():
+            location = os.path.join(settings.STATIC_DIR, path.removeprefix("/static/"))
+            try:
+                if os.stat(location).st_mtime > enqueued_at - self.grace_period:
+                    continue
+                os.remove(location)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.exception("Removing %s failed", location)
+                continue
+            removed += 1
+        return removed
+
+    async def wait(self) -> None:
+        """Waits until all the queued files are processed."""
+        if self.task is not None:
+            await self.task
+
+
+"""Collector shared by all the image deletes."""
+file_collector = FileCollector(
+    settings.IMAGE_GC_BATCH_SIZE, settings.IMAGE_GC_GRACE_PERIOD
+)
@@ -1,7 +1,146 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from pydantic import SecretStr
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.settings import settings
+
+"""Settings holding the calibrated cost of each scheme, with the checked values."""
+CALIBRATED_COSTS = {
+    "bcrypt": ("BCRYPT_ROUNDS", range(4, 32)),
+    "argon2": ("ARGON2_TIME_COST", range(1, 33)),
+    "scrypt": ("SCRYPT_ROUNDS", range(1, 21)),
+}
+
+
+def scheme_options(scheme: str, **costs: int) -> dict:
+    """Returns passlib options of the scheme, costs default to the ones from settings.
+
+    Minimal rounds match the configured ones, so cheaper hashes need an update.
+    """
+    costs = {**settings.dict(), **costs}
+    options = {
+        "bcrypt": {
+            "rounds": costs["BCRYPT_ROUNDS"],
+            "min_rounds": costs["BCRYPT_ROUNDS"],
+        },
+        "argon2": {
+            "type": "ID",
+            "time_cost": costs["ARGON2_TIME_COST"],
+            "memory_cost": costs["ARGON2_MEMORY_COST"],
+            "parallelism": costs["ARGON2_PARALLELISM"],
+        },
+        "scrypt": {
+            "rounds": costs["SCRYPT_ROUNDS"],
+            "min_rounds": costs["SCRYPT_ROUNDS"],
+            "block_size": costs["SCRYPT_BLOCK_SIZE"],
+            "parallelism": costs["SCRYPT_PARALLELISM"],
+        },
+    }
+    return options.get(scheme, {})
+
+
+def build_password_context(schemes: list[str], **costs: int) -> CryptContext:
+    """Builds the context out of given schemes and their costs.
+
+    First scheme is used for new hashes, rest of them are deprecated
+    and only verified, so their hashes get upgraded on the next login.
+    Raises an exception right away if any scheme has no backend installed,
+    rather than on the first login.
+    """
+    options = {
+        f"{scheme}__{name}": value
+        for scheme in schemes
+        for name, value in scheme_options(scheme, **costs).items()
+    }
+    context = CryptContext(schemes=schemes, deprecated="auto", **options)
+    for scheme in schemes:
+        handler = context.handler(scheme)
+        if hasattr(handler, "has_backend") and not handler.has_backend():
+            raise RuntimeError(f"Hashing scheme {scheme} has no backend installed")
+    return context
+
+
+password_context = build_password_context(settings.HASHING_SCHEMES)
+
+
+class HashingPool:
+    """Thread pool for the cpu heavy hashing, so it doesn't block the event loop.
+
+    Number of workers caps the concurrency, rest of the calls wait in the queue.
+    Once `max_pending` calls are either queued or running, new ones are rejected
+    right away, as they would rather time out than get their turn.
+    """
+
+    def __init__(self, max_workers: int, max_pending: Optional[int] = None):
+        """Initializes the executor and zeroed counters."""
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="hashing")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.rejected = 0
+
+    async def run(self, function: Callable, *args: Any) -> Any:
+        """Runs the function in one of the workers and waits for its result.
+
+        Raises an exception if the pool is already saturated.
+        """
+        with self.lock:
+            if self.max_pending and self.queued + self.running >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server is busy, try again later",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        future = self.executor.submit(self.call, function, *args)
+        future.add_done_callback(self.forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def call(self, function: Callable, *args: Any) -> Any:
+        """Calls the function inside the worker thread, keeping the counters."""
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return function(*args)
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.completed += 1
+
+    def forget_cancelled(self, future: Future) -> None:
+        """Drops the call cancelled before it left the queue from the counters."""
+        if future.cancelled():
+            with self.lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        """Returns the queue depth and the counters needed for sizing the pool."""
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+        }
+
+
+"""Pool shared by all the hashing calls made from the async handlers."""
+hashing_pool = HashingPool(settings.HASHING_WORKERS, settings.HASHING_MAX_PENDING)
 
 
 class HashingService:
@@ -18,3 +157,53 @@ class HashingService:
         return password_context.verify(
             plain_password.get_secret_value(), hashed_password
         )
+
+    @staticmethod
+    def verify_and_update_password(
+        plain_password: SecretStr, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """Checks the password and returns a new hash if the stored one is outdated."""
+        return password_context.verify_and_update(
+            plain_password.get_secret_value(), hashed_password
+        )
+
+    @staticmethod
+    def calibrate(scheme: str, target: float) -> tuple[str, int, float]:
+        """Finds the lowest cost of the scheme, which verification takes
+        at least the target time on this host.
+
+        Returns the setting name, its value and the measured time.
+        """
+        setting, costs = CALIBRATED_COSTS[scheme]
+        for cost in costs:
+            context = build_password_context([scheme], **{setting: cost})
+            hashed_password = context.hash("calibration-password")
+            start = time.perf_counter()
+            context.verify("calibration-password", hashed_password)
+            elapsed = time.perf_counter() - start
+            if elapsed >= target:
+                break
+        return setting, cost, elapsed
+
+    @classmethod
+    async def get_hashed_password_async(cls, password: SecretStr) -> str:
+        """Hashes the password in the hashing pool."""
+        return await hashing_pool.run(cls.get_hashed_password, password)
+
+    @classmethod
+    async def verify_password_async(
+        cls, plain_password: SecretStr, hashed_password: str
+    ) -> bool:
+        """Verifies the password in the hashing pool."""
+        return await hashing_pool.run(
+            cls.verify_password, plain_password, hashed_password
+        )
+
+    @classmethod
+    async def verify_and_update_password_async(
+        cls, plain_password: SecretStr, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """Verifies the password and builds its updated hash in the hashing pool."""
+        return await hashing_pool.run(
+            cls.verify_and_update_password, plain_password, hashed_password
+        )
@@ -1,9 +1,64 @@
-import shutil
+import asyncio
+import hashlib
+import os
+import re
+import time
 import uuid
+from bisect import bisect_left
+from contextlib import suppress
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterator, Optional
 
-from fastapi import UploadFile
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from PIL import UnidentifiedImageError
+from tortoise.query_utils import Q
 
 from src.database.models import Image
+from src.services.cache import resized_images_cache
+from src.services.derivatives import derivatives_pipeline, render_resized
+from src.services.garbage import file_collector
+from src.settings import settings
+
+makedirs = aiofiles.os.wrap(os.makedirs)
+
+"""Resizes in progress, keyed by the cached file names."""
+resizes: dict[str, asyncio.Future] = {}
+
+
+"""Name of the variant file, made of the original file stem, width and format."""
+VARIANT_NAME = re.compile(r"^(?P<stem>.+)-\d+\.(?P<format>\w+)$")
+
+
+def open_directory(location: str) -> Optional[Iterator[os.DirEntry]]:
+    """Returns a lazy listing of the directory, or none if it doesn't exist."""
+    try:
+        return os.scandir(location)
+    except FileNotFoundError:
+        return None
+
+
+def read_entries(
+    entries: Iterator[os.DirEntry], count: int
+) -> Optional[tuple[dict[str, float], list[str]]]:
+    """Reads up to count next entries of the directory listing,
+    or returns none once it's exhausted.
+
+    Returns modification times of the files by their names,
+    along with locations of the subdirectories.
+    """
+    batch = list(islice(entries, count))
+    if not batch:
+        return None
+    files, directories = {}, []
+    for entry in batch:
+        if entry.is_dir():
+            directories.append(entry.path)
+        elif entry.is_file():
+            files[entry.name] = entry.stat().st_mtime
+    return files, directories
 
 
 class ImageService:
@@ -11,25 +66,235 @@ class ImageService:
 
     @classmethod
     async def create_image(cls, image_file: UploadFile, folder: str) -> Image:
-        """Creates a file and creates an image model instance."""
-        file_location = cls.generate_image_path(image_file.filename, folder)
-        cls.create_file(file_location, image_file)
-        image = await Image.create(name=image_file.filename, path=file_location[1:])
+        """Creates a file and creates an image model instance.
+
+        Images with identical content share the file and its variants,
+        otherwise the variants are created in the background.
+        """
+        digest, image_path = await cls.create_file(image_file, folder)
+        stored_image = await Image.filter(digest=digest).order_by("-created_at").first()
+        image = await Image.create(
+            name=image_file.filename,
+            path=f"/static/{image_path}",
+            digest=digest,
+            variants=stored_image.variants if stored_image else [],
+        )
+        if not image.variants:
+            derivatives_pipeline.schedule(image, cls.get_file_location(image.path))
         return image
 
+    @classmethod
+    async def create_file(cls, image_file: UploadFile, folder: str) -> tuple[str, str]:
+        """Streams the uploaded image to the storage in chunks, hashing it on the way.
+
+        Chunks go to a temporary file, which is renamed once it's complete,
+        so a partially written image is never visible. File is stored under
+        its digest, replacing the identical one if it's already there,
+        so identical content is stored once, whatever its file name.
+        Upload exceeding the max size is aborted as soon as it's noticed
+        and the temporary file is removed.
+
+        Returns the digest and the path relative to the static folder.
+        """
+        temp_folder = os.path.join(settings.STATIC_DIR, folder)
+        await makedirs(temp_folder, exist_ok=True)
+        temp_location = os.path.join(temp_folder, f"{uuid.uuid4().hex}.part")
+        content_hash = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp_location, "wb") as file_object:
+                while chunk := await image_file.read(settings.UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.MAX_IMAGE_SIZE:
+                        raise HTTPException(
+                            status_code=413,
+                            detail="Image can't be larger than "
+                            f"{settings.MAX_IMAGE_SIZE // 1024 ** 2} MB",
+                        )
+                    content_hash.update(chunk)
+                    await file_object.write(chunk)
+            digest = content_hash.hexdigest()
+            image_path = await cls.get_image_path(image_file.filename, folder, digest)
+            file_location = os.path.join(settings.STATIC_DIR, image_path)
+            await makedirs(os.path.dirname(file_location), exist_ok=True)
+            await aiofiles.os.rename(temp_location, file_location)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                await aiofiles.os.remove(temp_location)
+            raise
+        return digest, image_path
+
+    @staticmethod
+    def get_file_location(path: str) -> str:
+        """Returns the location of the image file, based on its static url path."""
+        return os.path.join(settings.STATIC_DIR, path.removeprefix("/static/"))
+
+    @classmethod
+    async def get_resized_image(
+        cls,
+        image: Image,
+        width: Optional[int],
+        height: Optional[int],
+        image_format: str,
+    ) -> str:
+        """Returns the location of the image fitted into given box,
+        resizing it only if it's not cached yet.
+
+        Dimensions are rounded up to the size buckets, so the number of sizes
+        cached per image stays small. Images sharing the file share the cached
+        sizes as well. Concurrent requests for the same size share a single
+        resize, which isn't cancelled if one of the requesting clients
+        disconnects. Once too many resizes are pending, new ones are rejected.
+        """
+        width, height = cls.get_size_bucket(width), cls.get_size_bucket(height)
+        name = f"{image.digest or image.pk}-{width or 0}x{height or 0}.{image_format}"
+        location = await resized_images_cache.get(name)
+        if location:
+            return location
+        if name not in resizes:
+            if len(resizes) >= settings.RESIZES_MAX_PENDING:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server is busy, try again later",
+                    headers={"Retry-After": "1"},
+                )
+            resizes[name] = asyncio.ensure_future(
+                cls.resize_image(image, name, width, height, image_format)
+            )
+            resizes[name].add_done_callback(lambda _: resizes.pop(name, None))
+        return await asyncio.shield(resizes[name])
+
     @staticmethod
-    def create_file(file_location: str, image_file: UploadFile) -> None:
-        """Adds an image file based on the uploaded image to the static folder."""
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(image_file.file, file_object)
+    def get_size_bucket(size: Optional[int]) -> Optional[int]:
+        """Returns the smallest size bucket fitting given size, or the largest one."""
+        if size is None:
+            return None
+        buckets = settings.IMAGE_SIZE_BUCKETS
+        return buckets[min(bisect_left(buckets, size), len(buckets) - 1)]
+
+    @classmethod
+    async def resize_image(
+        cls,
+        image: Image,
+        name: str,
+        width: Optional[int],
+        height: Optional[int],
+        image_format: str,
+    ) -> str:
+        """Resizes the image in the worker process and caches the result."""
+        try:
+            size = await derivatives_pipeline.run(
+                render_resized,
+                cls.get_file_location(image.path),
+                await resized_images_cache.location(name),
+                width,
+                height,
+                image_format,
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Image file does not exist")
+        except (UnidentifiedImageError, OSError):
+            raise HTTPException(status_code=400, detail="Image can't be resized")
+        return await resized_images_cache.add(name, size)
+
+    @classmethod
+    async def reconcile_files(cls, folder: str) -> int:
+        """Reclaims images of given folder, which are no longer used.
+
+        Files without an image are handed over to the collector. Directories
+        are scanned one at a time and their files are checked against the image
+        paths in batches, so neither of them is loaded whole. Files modified
+        within the grace period are skipped, as they may belong to uploads
+        in progress. Images without a plant are deleted afterwards.
+
+        Returns the number of files without an image.
+        """
+        threshold = time.time() - settings.IMAGE_GC_GRACE_PERIOD
+        directories = [os.path.join(settings.STATIC_DIR, folder)]
+        orphans = 0
+        while directories:
+            orphans += await cls.reconcile_directory(
+                directories.pop(), directories, threshold
+            )
+        created_before = datetime.fromtimestamp(threshold, timezone.utc)
+        while images := await Image.filter(
+            plant=None, created_at__lt=created_before
+        ).limit(settings.IMAGE_GC_BATCH_SIZE):
+            await Image.filter(pk__in=[image.pk for image in images]).delete()
+            await Image.collect_files(images)
+        return orphans
+
+    @classmethod
+    async def reconcile_directory(
+        cls, location: str, directories: list[str], threshold: float
+    ) -> int:
+        """Hands the directory files without an image, which were modified before
+        the threshold, over to the collector and returns their number.
+
+        Listing is read in batches, each of them checked before the next one
+        is read. Subdirectories are added to the given directories.
+        """
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, open_directory, location)
+        if entries is None:
+            return 0
+        static_folder = "/static/" + os.path.relpath(location, settings.STATIC_DIR)
+        orphans = 0
+        with entries:
+            while batch := await loop.run_in_executor(
+                None, read_entries, entries, settings.IMAGE_GC_BATCH_SIZE
+            ):
+                files, subdirectories = batch
+                directories += subdirectories
+                orphaned_paths = await cls.find_orphaned_paths(
+                    static_folder,
+                    [
+                        name
+                        for name, modified_at in files.items()
+                        if modified_at < threshold
+                    ],
+                )
+                file_collector.enqueue(*orphaned_paths)
+                orphans += len(orphaned_paths)
+        return orphans
 
     @staticmethod
-    def generate_image_path(file_name: str, folder: str) -> str:
-        """Creates a full image file path based on file extension,
-        folder name and random uuid.
+    async def find_orphaned_paths(static_folder: str, names: list[str]) -> list[str]:
+        """Returns static paths of the folder files, which no image uses.
+
+        Names looking like variants are checked against the images of their
+        originals as well, as variants are recorded only on them.
+        """
+        if not names:
+            return []
+        paths = [f"{static_folder}/{name}" for name in names]
+        stems = {
+            match["stem"]
+            for match in map(VARIANT_NAME.match, names)
+            if match and match["format"] in settings.IMAGE_VARIANT_FORMATS
+        }
+        used_paths = set()
+        for path, variants in await Image.filter(
+            Q(
+                Q(path__in=paths),
+                *(Q(path__startswith=f"{static_folder}/{stem}.") for stem in stems),
+                join_type="OR",
+            )
+        ).values_list("path", "variants"):
+            used_paths.add(path)
+            used_paths.update(variant["path"] for variant in variants)
+        return [path for path in paths if path not in used_paths]
+
+    @staticmethod
+    async def get_image_path(file_name: str, folder: str, digest: str) -> str:
+        """Returns the path of the file with given digest, relative to the static
+        folder. It's the stored one if there is any, otherwise it's created
+        based on file extension, folder name and the digest.
+
+        Files are sharded by the digest prefixes, so no directory grows too large.
         """
-        extension = file_name.split(".")[-1]
-        prefix = f"./static/{folder}"
-        file_uuid = uuid.uuid4()
-        image_path = f"{prefix}/{file_uuid}.{extension}"
-        return image_path
+        stored_image = await Image.filter(digest=digest).order_by("-created_at").first()
+        if stored_image:
+            return stored_image.path.removeprefix("/static/")
+        extension = file_name.split(".")[-1].lower()
+        return f"{folder}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
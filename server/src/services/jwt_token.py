@@ -1,39 +1,90 @@
+import hashlib
 import os
+import secrets
 import time
 from typing import Optional
+from uuid import UUID
 
 from fastapi import HTTPException
 from jose import JWTError, jwt
 
 from src.database.models import User
 from src.schemas.jwt_token import JwtTokenDecoded, JwtTokenEncoded
+from src.schemas.users import TokenUser
+from src.services.cache import tokens_cache, users_cache
+from src.services.revocation import token_revocations
+from src.settings import settings
 
 JWT_SECRET = os.getenv("SECRET")
 JWT_ALGORITHM = os.getenv("ALGORITHM")
 
+"""Version of tokens containing the user claims."""
+TOKEN_VERSION = 2
+
 
 class JwtTokenService:
     """Service for controlling jwt tokens flow."""
 
     @staticmethod
-    def encode_jwt(email: str) -> JwtTokenEncoded:
-        """Returns valid jwt token based on given email."""
-        payload = {"email": email, "expires": time.time() + 1800}
+    def encode_jwt(
+        email: str, uuid: Optional[UUID] = None, is_superuser: Optional[bool] = None
+    ) -> JwtTokenEncoded:
+        """Returns valid jwt token based on given email.
+
+        If users uuid and superuser flag are given, they are added as claims,
+        so the token alone is enough to authorize the user.
+        """
+        issued = token_revocations.issue_time(email)
+        payload = {
+            "email": email,
+            "expires": issued + settings.ACCESS_TOKEN_LIFETIME,
+            "issued": issued,
+            "token_id": secrets.token_urlsafe(16),
+        }
+        if uuid is not None and is_superuser is not None:
+            payload.update(
+                uuid=str(uuid), is_superuser=is_superuser, version=TOKEN_VERSION
+            )
         token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
         return JwtTokenEncoded.parse_obj({"access_token": token})
 
+    @classmethod
+    def encode_user_jwt(cls, user: User) -> JwtTokenEncoded:
+        """Returns valid jwt token with the claims of given user."""
+        return cls.encode_jwt(user.email, user.uuid, user.is_superuser)
+
     @staticmethod
     def decode_jwt(token: str) -> Optional[JwtTokenDecoded]:
-        """Checks if given token is valid and not expired and returns its payload."""
-        try:
-            decoded_token = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            return (
-                JwtTokenDecoded.parse_obj(decoded_token)
-                if decoded_token["expires"] >= time.time()
-                else None
-            )
-        except JWTError:
+        """Checks if given token is valid and not expired and returns its payload.
+
+        Verified payloads are cached by the token hash,
+        so only the expiry and revocations are checked for already seen tokens.
+        """
+        cache_key = ("token", hashlib.sha256(token.encode()).hexdigest())
+        decoded_token = tokens_cache.get(cache_key)
+        if decoded_token is None:
+            try:
+                payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            except JWTError:
+                return None
+            if payload["expires"] < time.time():
+                return None
+            decoded_token = JwtTokenDecoded.parse_obj(payload)
+            tokens_cache.set(cache_key, decoded_token)
+        if decoded_token.expires < time.time():
             return None
+        if token_revocations.is_revoked(decoded_token):
+            return None
+        return decoded_token
+
+    @classmethod
+    def revoke_jwt(cls, token: str) -> bool:
+        """Revokes given token if it's valid, returns if it was revoked."""
+        decoded_token = cls.decode_jwt(token)
+        if not decoded_token or not decoded_token.token_id:
+            return False
+        token_revocations.revoke_token(decoded_token.token_id, decoded_token.expires)
+        return True
 
     @classmethod
     async def refresh_jwt(cls, token: str) -> JwtTokenEncoded:
@@ -44,7 +95,7 @@ class JwtTokenService:
                 status_code=401, detail="Token is either wrong or expired"
             )
         user = await cls.get_user_from_token(decoded_token)
-        refreshed_token = cls.encode_jwt(user.email)
+        refreshed_token = cls.encode_user_jwt(user)
         return refreshed_token
 
     @staticmethod
@@ -55,10 +106,26 @@ class JwtTokenService:
         if it's not valid and required is set to True.
 
         If payload matches all requirements, User instance is getting returned.
+        Users are cached for a short time, so most requests skip the query.
         """
-        user = await User.get_or_none(email=decoded_token.email)
+        user = users_cache.get(("user", decoded_token.email))
+        if user is None:
+            user = await User.get_or_none(email=decoded_token.email)
+            if user:
+                users_cache.set(("user", decoded_token.email), user)
         if required and not user:
             raise HTTPException(
                 status_code=401, detail="User from token payload does not exist"
             )
         return user
+
+    @classmethod
+    async def get_token_user(cls, decoded_token: JwtTokenDecoded) -> TokenUser:
+        """Returns the user identity, trusting the token claims if it has them.
+
+        Older tokens fall back to the user lookup.
+        """
+        if decoded_token.version >= TOKEN_VERSION:
+            return TokenUser.parse_obj(decoded_token.dict())
+        user = await cls.get_user_from_token(decoded_token)
+        return TokenUser.from_orm(user)
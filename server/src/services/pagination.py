@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from tortoise.query_utils import Q
+from tortoise.queryset import QuerySet
+
+
+class PaginationService:
+    """Service for keyset pagination over the (created_at, uuid) pair.
+
+    Cursors are opaque for the clients, they only have to pass them back.
+    """
+
+    @staticmethod
+    def dump_cursor(*values: Any) -> str:
+        """Builds an url safe cursor out of json serializable values."""
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def load_cursor(cursor: str) -> list:
+        """Reads the values stored in the cursor."""
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+    @classmethod
+    def encode_cursor(cls, created_at: datetime, uuid: UUID) -> str:
+        """Builds a cursor pointing right after the given row."""
+        return cls.dump_cursor(created_at.isoformat(), str(uuid))
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> tuple[datetime, UUID]:
+        """Reads the cursor values or raises an exception if it's malformed."""
+        try:
+            created_at, uuid = cls.load_cursor(cursor)
+            return datetime.fromisoformat(created_at), UUID(uuid)
+        except (binascii.Error, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor is not valid")
+
+    @classmethod
+    def encode_rank_cursor(cls, rank: float, uuid: UUID) -> str:
+        """Builds a cursor pointing right after the given search result."""
+        return cls.dump_cursor(rank, str(uuid))
+
+    @classmethod
+    def decode_rank_cursor(cls, cursor: str) -> tuple[float, UUID]:
+        """Reads the search cursor values or raises an exception if it's malformed."""
+        try:
+            rank, uuid = cls.load_cursor(cursor)
+            return float(rank), UUID(uuid)
+        except (binascii.Error, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor is not valid")
+
+    @classmethod
+    def paginate(
+        cls,
+        queryset: QuerySet,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+    ) -> QuerySet:
+        """Orders the queryset by the keyset and narrows it to rows after the cursor.
+
+        One additional row is fetched to find out if the next page exists.
+        """
+        lookup = "lt" if descending else "gt"
+        if cursor:
+            created_at, uuid = cls.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f"created_at__{lookup}": created_at})
+                | Q(created_at=created_at, **{f"uuid__{lookup}": uuid})
+            )
+        ordering = ("-created_at", "-uuid") if descending else ("created_at", "uuid")
+        return queryset.order_by(*ordering).limit(limit + 1)
+
+    @classmethod
+    def split_page(
+        cls, rows: Sequence[Any], limit: int
+    ) -> tuple[Sequence[Any], Optional[str]]:
+        """Cuts the lookahead row off and returns the page with the next cursor.
+
+        Rows can be either model instances or dicts fetched with values().
+        """
+        if len(rows) <= limit:
+            return rows, None
+        page = rows[:limit]
+        last_row = page[-1]
+        if isinstance(last_row, dict):
+            return page, cls.encode_cursor(last_row["created_at"], last_row["uuid"])
+        return page, cls.encode_cursor(last_row.created_at, last_row.uuid)
@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from src.settings import settings
+
+
+class RateLimiter:
+    """In-memory token buckets, one per key.
+
+    Each bucket holds up to `burst` tokens and regains `rate` of them per second.
+    Least recently used buckets are dropped above `max_keys`,
+    which only lets their keys start over with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        """Initializes an empty storage."""
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: Hashable) -> float:
+        """Takes a token from the keys bucket.
+
+        Returns zero if it was taken, otherwise the seconds until the next token.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        """Drops all the buckets."""
+        self.buckets.clear()
+
+
+"""Limiter of the credential requests coming from a single ip."""
+ip_limiter = RateLimiter(
+    settings.AUTH_IP_RATE, settings.AUTH_IP_BURST, settings.RATE_LIMIT_MAX_KEYS
+)
+
+"""Limiter of the credential requests concerning a single account."""
+email_limiter = RateLimiter(
+    settings.AUTH_EMAIL_RATE, settings.AUTH_EMAIL_BURST, settings.RATE_LIMIT_MAX_KEYS
+)
@@ -0,0 +1,29 @@
+import argparse
+
+from tortoise import Tortoise, run_async
+
+from src.services.garbage import file_collector
+from src.services.images import ImageService
+from src.settings import settings
+
+
+async def reconcile(folder: str) -> None:
+    """Reclaims the unused images of the folder and waits for their removal."""
+    await Tortoise.init(
+        db_url=settings.DATABASE_URL, modules={"models": settings.APP_MODELS}
+    )
+    orphans = await ImageService.reconcile_files(folder)
+    await file_collector.wait()
+    print(
+        f"{orphans} orphaned files found, {file_collector.removed} removed, "
+        f"{file_collector.skipped} skipped"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Removes image files, which are no longer used by any plant."
+    )
+    parser.add_argument("--folder", default="plant_images")
+    arguments = parser.parse_args()
+    run_async(reconcile(arguments.folder))
@@ -0,0 +1,99 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+
+from src.database.models import RefreshToken, User
+from src.services.revocation import token_revocations
+from src.settings import settings
+
+
+class RefreshTokenService:
+    """Service for issuing and rotating opaque refresh tokens.
+
+    Only hashes of the tokens are stored. Every refresh marks the token as used
+    and issues its successor in the same family, so a second use of any token
+    means it leaked and the whole family gets revoked.
+    """
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Returns the hash under which the token is stored."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @classmethod
+    async def issue(cls, user: User, family: Optional[UUID] = None) -> str:
+        """Creates a new refresh token for the user, starting a new family
+        if none is given. Users expired tokens are dropped on the way.
+        """
+        now = datetime.now(timezone.utc)
+        await RefreshToken.filter(user_id=user.pk, expires_at__lt=now).delete()
+        token = secrets.token_urlsafe(32)
+        await RefreshToken.create(
+            token_hash=cls.hash_token(token),
+            family=family or uuid4(),
+            expires_at=now + timedelta(seconds=settings.REFRESH_TOKEN_LIFETIME),
+            user_id=user.pk,
+        )
+        return token
+
+    @classmethod
+    async def rotate(cls, token: str) -> tuple[User, str]:
+        """Exchanges the refresh token for its successor, returns it with the user.
+
+        Token is marked as used with a conditional update, so out of
+        concurrent refreshes only one wins and the rest count as a reuse.
+        If the family got revoked while the successor was issued, it's revoked
+        again, so the successor doesn't outlive it.
+        """
+        refresh_token = (
+            await RefreshToken.filter(
+                token_hash=cls.hash_token(token),
+                is_revoked=False,
+                expires_at__gt=datetime.now(timezone.utc),
+            )
+            .select_related("user")
+            .first()
+        )
+        if not refresh_token:
+            raise HTTPException(
+                status_code=401, detail="Refresh token is either wrong or expired"
+            )
+        is_claimed = await RefreshToken.filter(
+            pk=refresh_token.pk, is_used=False, is_revoked=False
+        ).update(is_used=True)
+        if not is_claimed:
+            await cls.revoke_family(refresh_token.family)
+            token_revocations.revoke_user(refresh_token.user.email)
+            raise HTTPException(
+                status_code=401, detail="Refresh token has already been used"
+            )
+        successor = await cls.issue(refresh_token.user, refresh_token.family)
+        if await RefreshToken.exists(pk=refresh_token.pk, is_revoked=True):
+            await cls.revoke_family(refresh_token.family)
+            raise HTTPException(
+                status_code=401, detail="Refresh token has already been used"
+            )
+        return refresh_token.user, successor
+
+    @classmethod
+    async def revoke(cls, token: str) -> bool:
+        """Revokes the family of given token, returns if the token was found."""
+        refresh_token = await RefreshToken.get_or_none(token_hash=cls.hash_token(token))
+        if not refresh_token:
+            return False
+        await cls.revoke_family(refresh_token.family)
+        return True
+
+    @staticmethod
+    async def revoke_family(family: UUID) -> None:
+        """Revokes all the tokens rotated within the family."""
+        await RefreshToken.filter(family=family).update(is_revoked=True)
+
+    @staticmethod
+    async def revoke_user(user: User) -> None:
+        """Revokes all the refresh tokens of the user."""
+        await RefreshToken.filter(user_id=user.pk).update(is_revoked=True)
@@ -0,0 +1,74 @@
+import math
+import time
+
+from src.schemas.jwt_token import JwtTokenDecoded
+from src.settings import settings
+
+
+class TokenRevocations:
+    """In-memory set of revoked jwt tokens.
+
+    Single tokens are revoked by their ids, all the users tokens by the time
+    of revocation. Entries are kept only as long as revoked tokens could live.
+    """
+
+    def __init__(self, lifetime: float):
+        """Initializes empty storages."""
+        self.lifetime = lifetime
+        self.tokens: dict[str, float] = {}
+        self.users: dict[str, float] = {}
+
+    def revoke_token(self, token_id: str, expires: float) -> None:
+        """Revokes a single token until it expires."""
+        self.prune()
+        self.tokens[token_id] = expires
+
+    def revoke_user(self, email: str) -> None:
+        """Revokes all the tokens issued so far for the user with given email."""
+        self.prune()
+        self.users[email] = time.time()
+
+    def issue_time(self, email: str) -> float:
+        """Returns the issue time for a new token of the user with given email.
+
+        It's strictly later than the users last revocation, so the token issued
+        right after it, e.g. on a password change, isn't revoked along with
+        the previous ones, even if the clock is coarse or got set back.
+        """
+        now = time.time()
+        revoked_at = self.users.get(email)
+        if revoked_at is None or now > revoked_at:
+            return now
+        return math.nextafter(revoked_at, math.inf)
+
+    def is_revoked(self, decoded_token: JwtTokenDecoded) -> bool:
+        """Checks if the token or all the tokens of its user were revoked.
+
+        Tokens without the issue time are assumed to be issued with full lifetime.
+        """
+        if decoded_token.token_id in self.tokens:
+            return True
+        revoked_at = self.users.get(decoded_token.email)
+        if revoked_at is None:
+            return False
+        issued = decoded_token.issued or decoded_token.expires - self.lifetime
+        return issued <= revoked_at
+
+    def prune(self) -> None:
+        """Drops the entries which tokens have already expired."""
+        now = time.time()
+        self.tokens = {key: value for key, value in self.tokens.items() if value >= now}
+        self.users = {
+            key: value
+            for key, value in self.users.items()
+            if value + self.lifetime >= now
+        }
+
+    def clear(self) -> None:
+        """Drops all the revocations."""
+        self.tokens.clear()
+        self.users.clear()
+
+
+"""Revocations checked on every decoded token."""
+token_revocations = TokenRevocations(settings.ACCESS_TOKEN_LIFETIME)
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 from pydantic import BaseSettings
 
@@ -17,11 +18,58 @@ class Settings(BaseSettings):
     SUPERUSER_EMAIL: str = os.getenv("SUPERUSER_EMAIL")
     SUPERUSER_PASSWORD: str = os.getenv("SUPERUSER_PASSWORD")
 
-    APP_MODELS: list[str] = [
-        "src.database.models",
-        # TODO: Add aerich migrations
-        # "aerich.models"
-    ]
+    PAGE_SIZE: int = 20
+    MAX_PAGE_SIZE: int = 100
+    STREAM_CHUNK_SIZE: int = 500
+
+    PLANTS_CACHE_SIZE: int = 1024
+    PLANTS_CACHE_TTL: float = 60.0
+    FRAGMENTS_CACHE_SIZE: int = 4096
+    FRAGMENTS_CACHE_TTL: float = 3600.0
+    TOKENS_CACHE_SIZE: int = 4096
+    TOKENS_CACHE_TTL: float = 1800.0
+    USERS_CACHE_SIZE: int = 4096
+    USERS_CACHE_TTL: float = 30.0
+
+    ACCESS_TOKEN_LIFETIME: float = 1800.0
+    REFRESH_TOKEN_LIFETIME: float = 30 * 24 * 3600.0
+
+    HASHING_WORKERS: int = 4
+    HASHING_MAX_PENDING: int = 64
+    HASHING_SCHEMES: list[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    SCRYPT_ROUNDS: int = 16
+    SCRYPT_BLOCK_SIZE: int = 8
+    SCRYPT_PARALLELISM: int = 1
+
+    AUTH_IP_RATE: float = 0.5
+    AUTH_IP_BURST: int = 20
+    AUTH_EMAIL_RATE: float = 0.1
+    AUTH_EMAIL_BURST: int = 5
+    RATE_LIMIT_MAX_KEYS: int = 65536
+
+    STATIC_DIR: str = "static"
+    MAX_IMAGE_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    IMAGE_WORKERS: int = 2
+    IMAGE_VARIANT_WIDTHS: list[int] = [320, 640, 1280]
+    IMAGE_VARIANT_FORMATS: list[str] = ["avif", "webp", "jpeg"]
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_MAX_DIMENSION: int = 2560
+    IMAGE_SIZE_BUCKETS: list[int] = [80, 160, 320, 480, 640, 960, 1280, 1920, 2560]
+    RESIZES_MAX_PENDING: int = 16
+    RESIZED_IMAGES_CACHE_DIR: str = "cache/images"
+    RESIZED_IMAGES_CACHE_SIZE: int = 512 * 1024 * 1024
+    RESIZED_IMAGES_LEASE_TIME: float = 60.0
+    IMAGE_GC_BATCH_SIZE: int = 256
+    IMAGE_GC_GRACE_PERIOD: float = 300.0
+
+    TEMPLATES_CACHE_DIR: Optional[str] = os.getenv("TEMPLATES_CACHE_DIR")
+
+    APP_MODELS: list[str] = ["src.database.models"]
 
 
 settings = Settings()
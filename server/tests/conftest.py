@@ -1,5 +1,6 @@
 from collections import Generator
-from unittest.mock import mock_open, patch
+from pathlib import Path
+from unittest.mock import patch
 
 import nest_asyncio
 import pytest
@@ -10,8 +11,19 @@ from tortoise.contrib.test import finalizer, initializer
 
 from src.database.models import User
 from src.main import create_application
+from src.services.cache import (
+    fragments_cache,
+    plants_cache,
+    resized_images_cache,
+    tokens_cache,
+    users_cache,
+)
+from src.services.derivatives import derivatives_pipeline
+from src.services.garbage import file_collector
 from src.services.hashing import HashingService
 from src.services.jwt_token import JwtTokenService
+from src.services.rate_limit import email_limiter, ip_limiter
+from src.services.revocation import token_revocations
 from src.settings import settings
 
 TEST_USER_EMAIL = "pytest@auth.com"
@@ -19,11 +31,16 @@ TEST_USER_PASSWORD = HashingService.get_hashed_password(SecretStr("pytest-auth-u
 
 
 @pytest.fixture(scope="session", autouse=True)
-def create_file_mock() -> Generator[None]:
-    """Mocks the create file function logic to prevent adding files in tests."""
-    with patch("src.services.images.open", mock_open()):
-        with patch("src.services.images.shutil.copyfileobj"):
-            yield
+def static_dir(tmp_path_factory: pytest.TempPathFactory) -> Generator[Path]:
+    """Points the static and resized images folders to a temporary one
+    to prevent adding files in tests.
+    """
+    directory = tmp_path_factory.mktemp("static")
+    with patch.object(settings, "STATIC_DIR", str(directory)):
+        with patch.object(
+            resized_images_cache, "directory", str(directory / "resized")
+        ):
+            yield directory
 
 
 @pytest.fixture
@@ -31,11 +48,21 @@ async def client() -> Generator[AsyncClient]:
     """Async client with test database connection."""
     nest_asyncio.apply()
     initializer(modules=settings.APP_MODELS)
+    plants_cache.clear()
+    fragments_cache.clear()
+    tokens_cache.clear()
+    users_cache.clear()
+    resized_images_cache.clear()
+    token_revocations.clear()
+    ip_limiter.clear()
+    email_limiter.clear()
     app = create_application()
     async with AsyncClient(
         app=app, base_url="https://testserver"
     ) as test_client, LifespanManager(app):
         yield test_client
+        await derivatives_pipeline.wait()
+        await file_collector.wait()
     finalizer()
 
 
@@ -0,0 +1,58 @@
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+
+from src.database.models import User
+from src.services.jwt_token import JwtTokenService
+from src.settings import settings
+from tests.conftest import TEST_USER_EMAIL
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_cache_stats(auth_client: AsyncClient):
+    """Tests retrieving cache counters as a superuser."""
+    await User.filter(email=TEST_USER_EMAIL).update(is_superuser=True)
+    await auth_client.get("/api/plants")
+    await auth_client.get("/api/plants")
+    response = await auth_client.get("/api/cache/stats")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["plants"]["hits"] >= 1
+    assert data["plants"]["size"] == 1
+    assert data["fragments"]["max_size"] == settings.FRAGMENTS_CACHE_SIZE
+
+
+async def test_cache_stats_not_superuser(auth_client: AsyncClient):
+    """Tests retrieving cache counters as a regular user."""
+    response = await auth_client.get("/api/cache/stats")
+
+    assert response.status_code == 403
+    assert response.json().get("detail") == "You are not allowed to perform this action"
+
+
+async def test_cache_stats_token_claims(client: AsyncClient):
+    """Tests authorizing superuser with the token claims only."""
+    user = await User.create(
+        email="super@user.com", hashed_password="password", is_superuser=True
+    )
+    token = JwtTokenService.encode_user_jwt(user)
+    with mock.patch.object(User, "get_or_none") as get_user:
+        response = await client.get(
+            "/api/cache/stats",
+            headers={"Authorization": f"Bearer {token.access_token}"},
+        )
+
+    assert response.status_code == 200
+    get_user.assert_not_called()
+
+
+async def test_cache_stats_wrong_token(client: AsyncClient):
+    """Tests retrieving cache counters with a wrong token."""
+    response = await client.get(
+        "/api/cache/stats", headers={"Authorization": "Bearer wrong"}
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,27 @@
+import pytest
+from httpx import AsyncClient
+
+from src.database.models import User
+from src.settings import settings
+from tests.conftest import TEST_USER_EMAIL
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_hashing_stats(auth_client: AsyncClient):
+    """Tests retrieving hashing pool counters as a superuser."""
+    await User.filter(email=TEST_USER_EMAIL).update(is_superuser=True)
+    response = await auth_client.get("/api/hashing/stats")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["queued"] == data["running"] == 0
+    assert data["max_workers"] == settings.HASHING_WORKERS
+    assert data["max_pending"] == settings.HASHING_MAX_PENDING
+
+
+async def test_hashing_stats_not_superuser(auth_client: AsyncClient):
+    """Tests retrieving hashing pool counters as a regular user."""
+    response = await auth_client.get("/api/hashing/stats")
+
+    assert response.status_code == 403
@@ -1,5 +1,9 @@
+import json
+import os
+import time
 import uuid
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 from unittest import mock
 from unittest.mock import Mock
@@ -9,6 +13,9 @@ from httpx import AsyncClient
 
 from src.database.models import Image, Plant, User
 from src.database.models.enums import Conditions
+from src.schemas.plants import PlantModel, PlantQuerySet
+from src.services.garbage import file_collector
+from src.settings import settings
 
 pytestmark = [pytest.mark.asyncio]
 
@@ -80,6 +87,19 @@ async def test_create_plant(auth_client: AsyncClient):
     await check_all_fields(plant, data)
 
 
+async def test_create_plant_too_large_image(auth_client: AsyncClient):
+    """Tests rejecting the plant with an image exceeding the max size."""
+    files = {"image": ("large_image.jpg", bytes(8), "image/jpeg")}
+    with mock.patch.object(settings, "MAX_IMAGE_SIZE", 4):
+        response = await auth_client.post(
+            "/api/plants", data=PLANT_PAYLOAD, files=files
+        )
+
+    assert response.status_code == 413
+    assert await Image.all().count() == 0
+    assert await Plant.all().count() == 0
+
+
 async def test_create_plant_wrong_enum(auth_client: AsyncClient):
     """Tests plant creation using wrong enums in payload."""
     payload = PLANT_PAYLOAD.copy()
@@ -123,11 +143,187 @@ async def test_plants_list(client: AsyncClient):
     data = response.json()
 
     assert response.status_code == 200
-    assert len(data) == 3
+    assert len(data["items"]) == 3
+    assert data["next"] is None
+    for plant_instance, plant_response in zip(plants, data["items"]):
+        await check_all_fields(plant_instance, plant_response, user)
+
+
+async def test_plants_list_pagination(client: AsyncClient):
+    """Tests walking through the plants list page by page using the cursor."""
+    plants = [(await create_test_plant_instances())[2] for _ in range(5)]
+    first_page = (await client.get("/api/plants", params={"limit": 2})).json()
+    second_page = (
+        await client.get(
+            "/api/plants", params={"limit": 2, "cursor": first_page["next"]}
+        )
+    ).json()
+    last_page = (
+        await client.get(
+            "/api/plants", params={"limit": 2, "cursor": second_page["next"]}
+        )
+    ).json()
+
+    received = first_page["items"] + second_page["items"] + last_page["items"]
+    assert [item["uuid"] for item in received] == [str(plant.uuid) for plant in plants]
+    assert len(first_page["items"]) == len(second_page["items"]) == 2
+    assert last_page["next"] is None
+
+
+async def test_plants_list_wrong_cursor(client: AsyncClient):
+    """Tests retrieving list of plants using malformed cursor."""
+    response = await client.get("/api/plants", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor is not valid"
+
+
+async def test_plants_list_wrong_limit(client: AsyncClient):
+    """Tests retrieving list of plants with limit out of the allowed range."""
+    response = await client.get("/api/plants", params={"limit": 0})
+    assert response.status_code == 422
+
+
+async def test_plants_list_filtered_by_conditions(client: AsyncClient):
+    """Tests retrieving list of plants matching the conditions filters."""
+    _, _, plant = await create_test_plant_instances()
+    await create_test_plant_instances()
+    await Plant.filter(pk=plant.pk).update(humidity=Conditions.low)
+    response = await client.get(
+        "/api/plants", params={"temperature": "low", "humidity": "low"}
+    )
+    other_response = await client.get("/api/plants", params={"temperature": "high"})
+
+    assert [item["uuid"] for item in response.json()["items"]] == [str(plant.uuid)]
+    assert other_response.json()["items"] == []
+
+
+async def test_plants_list_filtered_by_creator_and_age(client: AsyncClient):
+    """Tests retrieving list of plants of given creator created within a range."""
+    user, _, first_plant = await create_test_plant_instances()
+    _, _, middle_plant = await create_test_plant_instances(user)
+    _, _, last_plant = await create_test_plant_instances(user)
+    other_user = await User.create(email="other@creator.com", hashed_password="pass")
+    await create_test_plant_instances(other_user)
+    response = await client.get(
+        "/api/plants",
+        params={
+            "creator": str(user.uuid),
+            "created_after": first_plant.created_at.isoformat(),
+            "created_before": last_plant.created_at.isoformat(),
+        },
+    )
+
+    assert [item["uuid"] for item in response.json()["items"]] == [
+        str(middle_plant.uuid)
+    ]
+
+
+async def test_plants_list_newest_first(client: AsyncClient):
+    """Tests walking through the plants list from the newest one."""
+    plants = [(await create_test_plant_instances())[2] for _ in range(3)]
+    params = {"limit": 2, "sort": "newest"}
+    first_page = (await client.get("/api/plants", params=params)).json()
+    last_page = (
+        await client.get("/api/plants", params={**params, "cursor": first_page["next"]})
+    ).json()
+
+    received = first_page["items"] + last_page["items"]
+    assert [item["uuid"] for item in received] == [
+        str(plant.uuid) for plant in reversed(plants)
+    ]
+    assert last_page["next"] is None
+
+
+async def test_plants_list_wrong_filters(client: AsyncClient):
+    """Tests retrieving list of plants with malformed filters."""
+    response = await client.get(
+        "/api/plants", params={"temperature": "freezing", "sort": "random"}
+    )
+    assert response.status_code == 422
+
+
+@mock.patch.object(settings, "STREAM_CHUNK_SIZE", 2)
+async def test_plants_stream(client: AsyncClient):
+    """Tests streaming list of all plants fetched in chunks."""
+    plants = [(await create_test_plant_instances())[2] for _ in range(5)]
+    user = await User.get(email="some@creator.com")
+    response = await client.get("/api/plants/stream")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert len(data) == 5
     for plant_instance, plant_response in zip(plants, data):
         await check_all_fields(plant_instance, plant_response, user)
 
 
+async def test_plants_stream_filtered(client: AsyncClient):
+    """Tests streaming list of plants matching the filters."""
+    _, _, plant = await create_test_plant_instances()
+    await Plant.filter(pk=plant.pk).update(temperature=Conditions.high)
+    await create_test_plant_instances()
+    response = await client.get("/api/plants/stream", params={"temperature": "high"})
+
+    assert [item["uuid"] for item in response.json()] == [str(plant.uuid)]
+
+
+async def test_plants_stream_empty(client: AsyncClient):
+    """Tests streaming list of plants with no plants present."""
+    response = await client.get("/api/plants/stream")
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def mock_search_connection(*plants: Plant) -> Mock:
+    """Mocks the postgres connection returning given plants as ranked search rows."""
+    rows = [
+        {
+            "uuid": plant.uuid,
+            "created_at": plant.created_at,
+            "name": plant.name,
+            "temperature": plant.temperature.value,
+            "humidity": plant.humidity.value,
+            "rank": 1 / (position + 1),
+        }
+        for position, plant in enumerate(plants)
+    ]
+    connection = Mock()
+    connection.execute_query = mock.AsyncMock(return_value=(len(rows), rows))
+    return connection
+
+
+async def test_plants_search(client: AsyncClient):
+    """Tests searching plants with ranked rows split into pages."""
+    plants = [(await create_test_plant_instances())[2] for _ in range(3)]
+    connection = mock_search_connection(*plants)
+    with mock.patch("src.database.crud.plants.Tortoise.get_connection") as mock_get:
+        mock_get.return_value = connection
+        response = await client.get("/api/plants/search", params={"q": "x", "limit": 2})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [item["uuid"] for item in data["items"]] == [str(p.uuid) for p in plants[:2]]
+    assert "rank" not in data["items"][0]
+    assert connection.execute_query.call_args.args[1] == ["x", True, None, None, 3]
+
+    connection.execute_query.return_value = (0, [])
+    with mock.patch("src.database.crud.plants.Tortoise.get_connection") as mock_get:
+        mock_get.return_value = connection
+        response = await client.get(
+            "/api/plants/search", params={"q": "x", "cursor": data["next"]}
+        )
+
+    assert response.json() == {"items": [], "next": None}
+    assert connection.execute_query.call_args.args[1][2:4] == [0.5, plants[1].uuid]
+
+
+async def test_plants_search_wrong_cursor(client: AsyncClient):
+    """Tests searching plants using malformed cursor."""
+    response = await client.get("/api/plants/search", params={"q": "x", "cursor": "x"})
+    assert response.status_code == 400
+
+
 async def test_plant_retrieve(client: AsyncClient):
     """Tests retrieving specific plant."""
     user, _, plant = await create_test_plant_instances()
@@ -138,25 +334,127 @@ async def test_plant_retrieve(client: AsyncClient):
     await check_all_fields(plant, data, user)
 
 
+async def test_plant_retrieve_cached(auth_client: AsyncClient):
+    """Tests serving plant from the cache until it gets deleted."""
+    user = await User.get(email="pytest@auth.com")
+    _, _, plant = await create_test_plant_instances(user=user)
+    await auth_client.get(f"/api/plants/{plant.uuid}")
+    await Plant.filter(uuid=plant.uuid).update(name="Changed Name")
+    cached_response = await auth_client.get(f"/api/plants/{plant.uuid}")
+
+    assert cached_response.json()["name"] == PLANT_PAYLOAD["name"]
+
+    await auth_client.delete(f"/api/plants/{plant.uuid}")
+    response = await auth_client.get(f"/api/plants/{plant.uuid}")
+
+    assert response.status_code == 404
+
+
+async def test_plants_list_invalidated(auth_client: AsyncClient):
+    """Tests dropping cached plants list after plant creation."""
+    await create_test_plant_instances()
+    assert len((await auth_client.get("/api/plants")).json()["items"]) == 1
+
+    response = await auth_client.post(
+        "/api/plants", data=PLANT_PAYLOAD, files=TEST_FILE
+    )
+    await Plant.filter(uuid=response.json()["uuid"]).update(is_accepted=True)
+
+    assert len((await auth_client.get("/api/plants")).json()["items"]) == 2
+
+
+async def test_plant_retrieve_not_modified(client: AsyncClient):
+    """Tests revalidating plant using the etag."""
+    _, _, plant = await create_test_plant_instances()
+    response = await client.get(f"/api/plants/{plant.uuid}")
+    etag = response.headers["etag"]
+    not_modified_response = await client.get(
+        f"/api/plants/{plant.uuid}", headers={"If-None-Match": f"W/{etag}"}
+    )
+
+    assert not_modified_response.status_code == 304
+    assert not_modified_response.headers["etag"] == etag
+    assert not_modified_response.content == b""
+
+
+async def test_plants_list_not_modified(client: AsyncClient):
+    """Tests revalidating plants list using the etag before and after a change."""
+    await create_test_plant_instances()
+    etag = (await client.get("/api/plants")).headers["etag"]
+    not_modified_response = await client.get(
+        "/api/plants", headers={"If-None-Match": f'"other", {etag}'}
+    )
+    await (await Plant.first()).delete()
+    modified_response = await client.get("/api/plants", headers={"If-None-Match": etag})
+
+    assert not_modified_response.status_code == 304
+    assert modified_response.status_code == 200
+    assert modified_response.headers["etag"] != etag
+
+
+async def test_plant_payloads_match_schemas(client: AsyncClient):
+    """Tests if projection based payloads match the pydantic schemas output."""
+    user, _, plant = await create_test_plant_instances()
+    await plant.fetch_related("creator")
+    plant_response = (await client.get(f"/api/plants/{plant.uuid}")).json()
+    list_response = (await client.get("/api/plants")).json()
+    plant_queryset = await PlantQuerySet.from_queryset(Plant.all())
+
+    assert plant_response == json.loads(PlantModel.from_orm(plant).json())
+    assert list_response["items"] == json.loads(plant_queryset.json())
+
+
 async def test_plant_retrieve_wrong_pk(client: AsyncClient):
     """Tests retrieving not existing plant."""
     response = await client.get(f"/api/plants/{uuid.uuid4()}")
     assert response.status_code == 404
 
 
-@mock.patch("src.database.models.images.shutil.which", return_value=True)
-@mock.patch("src.database.models.images.shutil.rmtree")
-async def test_plant_delete(
-    mock_which: Mock, mock_rmtree: Mock, auth_client: AsyncClient
-):
-    """Tests deleting plant."""
+def create_image_file(path: str, age: float = 3600) -> Path:
+    """Creates a file at the static path, modified given number of seconds ago."""
+    location = Path(settings.STATIC_DIR) / path.removeprefix("/static/")
+    location.parent.mkdir(parents=True, exist_ok=True)
+    location.write_bytes(b"image content")
+    modified_at = time.time() - age
+    os.utime(location, (modified_at, modified_at))
+    return location
+
+
+async def test_plant_delete(auth_client: AsyncClient):
+    """Tests deleting plant along with its image files."""
     user = await User.get(email="pytest@auth.com")
-    _, _, plant = await create_test_plant_instances(user=user)
+    variant = {"path": "/static/plant_images/deleted-320.webp", "width": 320}
+    image = await Image.create(
+        name="deleted.jpg", path="/static/plant_images/deleted.jpg", variants=[variant]
+    )
+    locations = [create_image_file(path) for path in image.file_paths]
+    _, _, plant = await create_test_plant_instances(user=user, image=image)
     response = await auth_client.delete(f"/api/plants/{plant.uuid}")
+    await file_collector.wait()
 
     assert response.status_code == 200
     assert await Plant.all().count() == 0
     assert await Image.all().count() == 0
+    assert not any(location.exists() for location in locations)
+
+
+async def test_plant_delete_shared_image(auth_client: AsyncClient):
+    """Tests keeping the image file, which is shared with another plant."""
+    user = await User.get(email="pytest@auth.com")
+    images = [
+        await Image.create(
+            name=name, path="/static/plant_images/shared.jpg", digest="0" * 64
+        )
+        for name in ("first.jpg", "second.jpg")
+    ]
+    location = create_image_file(images[0].path)
+    _, _, plant = await create_test_plant_instances(user=user, image=images[0])
+    response = await auth_client.delete(f"/api/plants/{plant.uuid}")
+    await file_collector.wait()
+
+    assert response.status_code == 200
+    assert await Image.all().count() == 1
+    assert location.exists()
 
 
 async def test_plant_delete_wrong_pk(auth_client: AsyncClient):
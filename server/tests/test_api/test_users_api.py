@@ -1,12 +1,15 @@
 import json
+from unittest import mock
 
 import pytest
 from httpx import AsyncClient
 from pydantic import SecretStr
 
-from src.database.models import User
-from src.services.hashing import HashingService
+from src.database.models import RefreshToken, User
+from src.services.hashing import HashingService, build_password_context
 from src.services.jwt_token import JwtTokenService
+from src.services.rate_limit import email_limiter, ip_limiter
+from src.services.refresh_token import RefreshTokenService
 
 pytestmark = [pytest.mark.asyncio]
 
@@ -20,6 +23,7 @@ async def test_create_user(client: AsyncClient):
     assert response.status_code == 201
     decoded_token = JwtTokenService.decode_jwt(data.get("access_token"))
     assert decoded_token.dict().get("email") == payload.get("email")
+    assert data.get("refresh_token")
     assert await User.all().count() == 1
 
 
@@ -54,6 +58,47 @@ async def test_login(client: AsyncClient):
     assert response.status_code == 200
     decoded_token = JwtTokenService.decode_jwt(data.get("access_token"))
     assert decoded_token.dict().get("email") == instance.email
+    assert await RefreshToken.filter(user_id=instance.pk).count() == 1
+
+
+async def test_login_rehashes_outdated_password(client: AsyncClient):
+    """Checks upgrading the stored hash made with outdated cost."""
+    outdated_context = build_password_context(["bcrypt"], BCRYPT_ROUNDS=4)
+    payload = {
+        "email": "max.halloway@gmail.com",
+        "hashed_password": outdated_context.hash("__blessed..."),
+    }
+    instance = await User.create(**payload)
+    payload["password"] = "__blessed..."
+    response = await client.post("/api/users/login", data=json.dumps(payload))
+
+    assert response.status_code == 200
+    await instance.refresh_from_db()
+    assert instance.hashed_password != payload["hashed_password"]
+    assert instance.hashed_password.startswith("$2b$12$")
+    assert HashingService.verify_password(
+        SecretStr("__blessed..."), instance.hashed_password
+    )
+
+
+async def test_login_rehashes_deprecated_scheme(client: AsyncClient):
+    """Checks upgrading the stored hash made with a deprecated scheme."""
+    pytest.importorskip("argon2")
+    context = build_password_context(["argon2", "bcrypt"], ARGON2_MEMORY_COST=1024)
+    payload = {
+        "email": "max.halloway@gmail.com",
+        "hashed_password": HashingService.get_hashed_password(
+            SecretStr("__blessed...")
+        ),
+    }
+    instance = await User.create(**payload)
+    payload["password"] = "__blessed..."
+    with mock.patch("src.services.hashing.password_context", context):
+        response = await client.post("/api/users/login", data=json.dumps(payload))
+
+    assert response.status_code == 200
+    await instance.refresh_from_db()
+    assert context.identify(instance.hashed_password) == "argon2"
 
 
 async def test_login_wrong_credentials(client: AsyncClient):
@@ -73,6 +118,35 @@ async def test_login_wrong_credentials(client: AsyncClient):
     assert data["detail"] == "Wrong email or password"
 
 
+async def test_login_rate_limited_per_email(client: AsyncClient):
+    """Checks limiting the login attempts concerning a single account."""
+    payload = {"email": "Conor@gmail.com", "password": "notorious"}
+    with mock.patch.object(email_limiter, "burst", 2):
+        responses = [
+            await client.post("/api/users/login", data=json.dumps(payload))
+            for _ in range(3)
+        ]
+        payload["email"] = "conor@gmail.com"
+        lowercase_response = await client.post(
+            "/api/users/login", data=json.dumps(payload)
+        )
+
+    assert [response.status_code for response in responses] == [401, 401, 429]
+    assert responses[-1].json()["detail"] == "Too many requests, try again later"
+    assert int(responses[-1].headers["Retry-After"]) > 0
+    assert lowercase_response.status_code == 429
+
+
+async def test_register_rate_limited_per_ip(client: AsyncClient):
+    """Checks limiting the credential requests coming from a single ip."""
+    with mock.patch.object(ip_limiter, "burst", 1):
+        first_response = await client.post("/api/users/register")
+        second_response = await client.post("/api/users/register", data="[]")
+
+    assert first_response.status_code == 422
+    assert second_response.status_code == 429
+
+
 async def test_login_not_existing_user(client: AsyncClient):
     """Checks user login with not existing user credentials."""
     payload = {
@@ -128,3 +202,100 @@ async def test_refresh_not_existing_using_user(client: AsyncClient):
 
     assert response.status_code == 401
     assert data["detail"] == "User from token payload does not exist"
+
+
+async def test_logout(client: AsyncClient):
+    """Checks revoking the access token."""
+    user = await User.create(email="khabib@gmail.com", hashed_password="eagle")
+    jwt = JwtTokenService.encode_user_jwt(user)
+    headers = {"Authorization": f"Bearer {jwt.access_token}"}
+    response = await client.post("/api/users/logout", headers=headers)
+    refresh_response = await client.get("/api/users/refresh", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() is True
+    assert refresh_response.status_code == 401
+
+
+async def test_logout_wrong_token(client: AsyncClient):
+    """Checks revoking a wrong access token."""
+    response = await client.post(
+        "/api/users/logout", headers={"Authorization": "Bearer wrong"}
+    )
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token is either wrong or expired"
+
+
+async def test_refresh_token(client: AsyncClient):
+    """Checks exchanging the refresh token for a new pair of tokens."""
+    user = await User.create(email="israel@gmail.com", hashed_password="stylebender")
+    refresh_token = await RefreshTokenService.issue(user)
+    response = await client.post(
+        "/api/users/token/refresh", json={"refresh_token": refresh_token}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    decoded_token = JwtTokenService.decode_jwt(data["access_token"])
+    assert decoded_token.email == user.email
+    assert data["refresh_token"] != refresh_token
+    tokens = await RefreshToken.filter(user_id=user.pk).order_by("created_at")
+    assert [token.is_used for token in tokens] == [True, False]
+    assert tokens[0].family == tokens[1].family
+
+
+async def test_refresh_token_reused(client: AsyncClient):
+    """Checks revoking the whole family after the refresh token gets reused."""
+    user = await User.create(email="kamaru@gmail.com", hashed_password="nightmare")
+    refresh_token = await RefreshTokenService.issue(user)
+    access_token = JwtTokenService.encode_user_jwt(user).access_token
+    first_response = await client.post(
+        "/api/users/token/refresh", json={"refresh_token": refresh_token}
+    )
+    reuse_response = await client.post(
+        "/api/users/token/refresh", json={"refresh_token": refresh_token}
+    )
+    successor_response = await client.post(
+        "/api/users/token/refresh",
+        json={"refresh_token": first_response.json()["refresh_token"]},
+    )
+
+    assert first_response.status_code == 200
+    assert reuse_response.status_code == 401
+    assert reuse_response.json()["detail"] == "Refresh token has already been used"
+    assert successor_response.status_code == 401
+    assert (
+        successor_response.json()["detail"]
+        == "Refresh token is either wrong or expired"
+    )
+    assert JwtTokenService.decode_jwt(access_token) is None
+
+
+async def test_refresh_token_wrong_token(client: AsyncClient):
+    """Checks refreshing with a token that was never issued."""
+    response = await client.post(
+        "/api/users/token/refresh", json={"refresh_token": "wrong"}
+    )
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token is either wrong or expired"
+
+
+async def test_revoke_refresh_token(client: AsyncClient):
+    """Checks revoking the refresh token family."""
+    user = await User.create(email="valentina@gmail.com", hashed_password="bullet")
+    refresh_token = await RefreshTokenService.issue(user)
+    response = await client.post(
+        "/api/users/token/revoke", json={"refresh_token": refresh_token}
+    )
+    wrong_response = await client.post(
+        "/api/users/token/revoke", json={"refresh_token": "wrong"}
+    )
+    refresh_response = await client.post(
+        "/api/users/token/refresh", json={"refresh_token": refresh_token}
+    )
+
+    assert response.json() is True
+    assert wrong_response.json() is False
+    assert refresh_response.status_code == 401
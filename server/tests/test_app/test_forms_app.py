@@ -0,0 +1,143 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+from pydantic import SecretStr
+from tortoise.expressions import F
+
+from src.api.forms.generic import GenericForm
+from src.api.forms.lookups import FormLookups
+from src.api.forms.plants import PlantEditForm
+from src.api.forms.validators.generic import GenericValidator
+from src.api.forms.validators.users import PasswordCorrectValidator
+from src.database.models import Plant, User
+from tests.test_api.test_plants_api import create_test_plant_instances
+from tests.test_app.test_plants_app import PLANT_EDIT_PAYLOAD
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class SlowValidator(GenericValidator):
+    async def validate(self, data: dict) -> None:
+        """Records the start and fails if asked to."""
+        data["started"].append(type(self).__name__)
+        await asyncio.sleep(0.01)
+        data["finished"].append(type(self).__name__)
+        if type(self).__name__ in data["failing"]:
+            self.errors.append(f"{type(self).__name__} failed")
+
+
+class FirstValidator(SlowValidator):
+    """First independent validator."""
+
+
+class SecondValidator(SlowValidator):
+    """Second independent validator."""
+
+
+class DependentValidator(SlowValidator):
+    depends_on = (FirstValidator,)
+
+
+class SyncValidator(GenericValidator):
+    def validate(self, data: dict) -> None:
+        """Fails if asked to."""
+        if "SyncValidator" in data["failing"]:
+            self.errors.append("SyncValidator failed")
+
+
+class LoopValidator(SlowValidator):
+    """Validator depending on the one depending on it."""
+
+
+class LoopingValidator(SlowValidator):
+    depends_on = (LoopValidator,)
+
+
+LoopValidator.depends_on = (LoopingValidator,)
+
+
+class ExampleForm(GenericForm):
+    def __init__(self, *validators, failing: tuple[str, ...] = ()):
+        """Builds the form with given validators."""
+        super().__init__()
+        self.data = {"started": [], "finished": [], "failing": failing}
+        self.validators = list(validators)
+
+
+async def test_independent_validators_run_concurrently():
+    """Tests running independent validators together and dependent ones later."""
+    form = ExampleForm(DependentValidator, FirstValidator, SecondValidator)
+    await form.validate()
+
+    assert form.errors == []
+    assert form.data["started"][:2] == ["FirstValidator", "SecondValidator"]
+    assert form.data["finished"][:2] == ["FirstValidator", "SecondValidator"]
+    assert form.data["started"][2] == "DependentValidator"
+
+
+async def test_failed_dependency_skips_validator():
+    """Tests skipping validators which dependencies failed."""
+    form = ExampleForm(
+        FirstValidator, DependentValidator, SecondValidator, failing=("FirstValidator",)
+    )
+    await form.validate()
+
+    assert form.errors == ["FirstValidator failed"]
+    assert "DependentValidator" not in form.data["started"]
+
+
+async def test_failed_sync_validator_skips_async_ones():
+    """Tests short circuiting async validators when sync ones fail."""
+    form = ExampleForm(FirstValidator, SyncValidator, failing=("SyncValidator",))
+    await form.validate()
+
+    assert form.errors == ["SyncValidator failed"]
+    assert form.data["started"] == []
+
+
+async def test_circular_dependencies():
+    """Tests rejecting validators depending on each other."""
+    form = ExampleForm(FirstValidator, LoopValidator, LoopingValidator)
+    with pytest.raises(ValueError):
+        await form.validate()
+
+
+async def test_lookups_single_query(client: AsyncClient):
+    """Tests sharing a single query between concurrent lookups."""
+    user = await User.create(email="looked@up.com", hashed_password="password")
+    lookups = FormLookups()
+
+    with mock.patch.object(User, "get_or_none", wraps=User.get_or_none) as get_user:
+        users = await asyncio.gather(
+            lookups.get_or_none(User, email=user.email),
+            lookups.get_or_none(User, email=user.email),
+        )
+        assert await lookups.get_or_none(User, email=user.email) == user
+
+    assert users == [user, user]
+    get_user.assert_called_once_with(email=user.email)
+
+
+async def test_password_correct_validator_no_user(client: AsyncClient):
+    """Tests skipping password check for not existing user."""
+    validator = PasswordCorrectValidator()
+    await validator.validate({"email": "no@user.com", "password": SecretStr("pass")})
+
+    assert validator.errors == []
+
+
+async def test_plant_edit_form_keeps_concurrent_version_bump(client: AsyncClient):
+    """Checks that editing a stale plant doesn't overwrite a concurrent bump."""
+    user, _, plant = await create_test_plant_instances()
+    await Plant.filter(pk=plant.pk).update(version=F("version") + 1)
+    form = PlantEditForm(
+        {"user": user}, **PLANT_EDIT_PAYLOAD, image=UploadFile(filename=".")
+    )
+
+    edited_plant = await form.update(plant)
+
+    assert edited_plant.version == 3
+    assert (await Plant.get(pk=plant.pk)).version == 3
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image as PILImage
+
+from src.database.models import Image
+from src.services.cache import resized_images_cache
+from src.services.derivatives import derivatives_pipeline
+from src.settings import settings
+from tests.test_services.test_derivatives_service import create_test_image
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def create_test_image_instance(content: bytes) -> Image:
+    """Stores the image file in the static folder and creates its instance."""
+    name = f"{uuid.uuid4()}.png"
+    folder = Path(settings.STATIC_DIR) / "plant_images"
+    folder.mkdir(exist_ok=True)
+    (folder / name).write_bytes(content)
+    return await Image.create(name=name, path=f"/static/plant_images/{name}")
+
+
+async def test_image_resized(client: AsyncClient):
+    """Tests resizing the image to the size bucket on first request
+    and reusing the cached file for the sizes of the same bucket.
+    """
+    image = await create_test_image_instance(create_test_image((600, 400)))
+    hits = resized_images_cache.hits
+    response = await client.get(f"/images/{image.pk}?w=300&fmt=jpeg")
+    cached_response = await client.get(f"/images/{image.pk}?w=310&fmt=jpeg")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
+    assert cached_response.content == response.content
+    assert resized_images_cache.hits == hits + 1
+    location = await resized_images_cache.get(f"{image.pk}-320x0.jpeg")
+    with PILImage.open(location) as resized:
+        assert resized.size == (320, 213)
+
+
+async def test_image_resized_coalesced(client: AsyncClient):
+    """Tests sharing a single resize between concurrent requests."""
+    image = await create_test_image_instance(create_test_image((600, 400)))
+    with mock.patch.object(
+        derivatives_pipeline, "run", wraps=derivatives_pipeline.run
+    ) as run:
+        responses = await asyncio.gather(
+            *(client.get(f"/images/{image.pk}?h=100") for _ in range(3))
+        )
+
+    assert [response.status_code for response in responses] == [200] * 3
+    assert responses[0].headers["content-type"] == "image/webp"
+    run.assert_called_once()
+
+
+async def test_image_resized_busy(client: AsyncClient):
+    """Tests rejecting the resize once too many of them are pending."""
+    image = await create_test_image_instance(create_test_image((600, 400)))
+    with mock.patch.object(settings, "RESIZES_MAX_PENDING", 0):
+        response = await client.get(f"/images/{image.pk}?w=100")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.parametrize(
+    "query,status_code", [("w=0", 422), ("fmt=gif", 422), ("w=100", 404)]
+)
+async def test_image_resized_wrong_request(
+    client: AsyncClient, query: str, status_code: int
+):
+    """Tests requesting wrong sizes, formats or not existing image."""
+    response = await client.get(f"/images/{uuid.uuid4()}?{query}")
+
+    assert response.status_code == status_code
+
+
+async def test_image_resized_missing_file(client: AsyncClient):
+    """Tests resizing the image which file does not exist."""
+    image = await Image.create(name="missing.png", path="/static/missing.png")
+    response = await client.get(f"/images/{image.pk}")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Image file does not exist"
+
+
+async def test_image_resized_not_an_image(client: AsyncClient):
+    """Tests resizing the file which is not an image."""
+    image = await create_test_image_instance(b"not an image")
+    response = await client.get(f"/images/{image.pk}")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Image can't be resized"
@@ -1,15 +1,19 @@
 import uuid
+from unittest import mock
 
 import pytest
 from httpx import AsyncClient
 
 from src.database.models import Image, Plant, User
 from src.database.models.enums import Conditions
+from src.services.cache import fragments_cache
+from src.settings import settings
 from tests.conftest import TEST_USER_EMAIL
 from tests.test_api.test_plants_api import (
     TEST_FILE,
     check_all_fields,
     create_test_plant_instances,
+    mock_search_connection,
 )
 from tests.test_app.test_users_app import USER_PAYLOAD
 
@@ -65,6 +69,115 @@ async def test_plants_dashboard(cookie_client: AsyncClient):
         assert plant["name"] in content
 
 
+@mock.patch.object(settings, "PAGE_SIZE", 1)
+async def test_plants_dashboard_cards(cookie_client: AsyncClient):
+    """Tests loading next dashboard pages as card fragments."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    for plant_payload in PLANTS_PAYLOAD:
+        image = await Image.create(name="some_name.jpg", path="some/path")
+        await Plant.create(**plant_payload, creator=user, image=image)
+
+    response = await cookie_client.get("/")
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert PLANTS_PAYLOAD[0]["name"] in content
+    assert PLANTS_PAYLOAD[1]["name"] not in content
+    assert "Load more" in content
+
+    next_url = content.split("data-load-more>")[1].split('href="')[1].split('"')[0]
+    response = await cookie_client.get(next_url)
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert "<html" not in content
+    assert PLANTS_PAYLOAD[1]["name"] in content
+    assert "Load more" not in content
+
+
+@mock.patch.object(settings, "PAGE_SIZE", 1)
+async def test_plants_dashboard_search(cookie_client: AsyncClient):
+    """Tests searching plants on the dashboard and loading next search results."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    _, _, first_plant = await create_test_plant_instances(user)
+    _, _, second_plant = await create_test_plant_instances(user)
+    await Plant.filter(uuid=second_plant.uuid).update(name="Second Plant")
+    connection = mock_search_connection(second_plant, first_plant)
+
+    with mock.patch("src.database.crud.plants.Tortoise.get_connection") as mock_get:
+        mock_get.return_value = connection
+        response = await cookie_client.get("/", params={"q": "plant"})
+        content = response.content.decode()
+        next_url = content.split("data-load-more>")[1].split('href="')[1].split('"')[0]
+        connection.execute_query.return_value = (1, [])
+        next_response = await cookie_client.get(next_url.replace("&amp;", "&"))
+
+    assert response.status_code == 200
+    assert 'value="plant"' in content
+    assert "Second Plant" in content
+    assert "q=plant" in next_url
+    assert next_response.status_code == 200
+    assert connection.execute_query.call_args.args[1][:2] == ["plant", False]
+
+
+@mock.patch.object(settings, "PAGE_SIZE", 1)
+async def test_plants_dashboard_filters(cookie_client: AsyncClient):
+    """Tests filtering and sorting dashboard plants, keeping filters on next pages."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    for plant_payload in [*PLANTS_PAYLOAD, PLANT_EDIT_PAYLOAD]:
+        image = await Image.create(name="some_name.jpg", path="some/path")
+        await Plant.create(**plant_payload, creator=user, image=image)
+    params = {"temperature": "high", "humidity": "low"}
+
+    response = await cookie_client.get("/", params=params)
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert "Load more" not in content
+    assert PLANT_EDIT_PAYLOAD["name"] in content
+    assert PLANTS_PAYLOAD[0]["name"] not in content
+
+    response = await cookie_client.get("/", params={"sort": "newest"})
+    content = response.content.decode()
+    next_url = content.split("data-load-more>")[1].split('href="')[1].split('"')[0]
+    next_response = await cookie_client.get(next_url.replace("&amp;", "&"))
+
+    assert PLANT_EDIT_PAYLOAD["name"] in content
+    assert "sort=newest" in next_url
+    assert "temperature" not in next_url
+    assert PLANTS_PAYLOAD[1]["name"] in next_response.content.decode()
+
+
+async def test_plants_dashboard_cached_cards(cookie_client: AsyncClient):
+    """Tests reusing rendered cards until the plant gets edited."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    _, _, plant = await create_test_plant_instances(user)
+    await Plant.filter(pk=plant.pk).update(is_accepted=False)
+
+    await cookie_client.get("/")
+    response = await cookie_client.get("/")
+
+    assert PLANT_PAYLOAD["name"] in response.content.decode()
+    assert fragments_cache.stats()["size"] == 1
+    assert fragments_cache.get(("card", plant.uuid, 1)) is not None
+
+    await cookie_client.post(
+        f"/plant/edit/{plant.pk}", data=PLANT_EDIT_PAYLOAD, files=EMPTY_FILE
+    )
+    response = await cookie_client.get("/")
+    content = response.content.decode()
+
+    assert PLANT_EDIT_PAYLOAD["name"] in content
+    assert PLANT_PAYLOAD["name"] not in content
+    assert fragments_cache.get(("card", plant.uuid, 2)) is not None
+
+
+async def test_plants_dashboard_cards_wrong_cursor(cookie_client: AsyncClient):
+    """Tests loading dashboard cards using malformed cursor."""
+    response = await cookie_client.get("/plant/cards", params={"cursor": "wrong"})
+    assert response.status_code == 400
+
+
 async def test_plant_details(cookie_client: AsyncClient):
     """Tests plant details route."""
     _, _, plant = await create_test_plant_instances()
@@ -76,6 +189,39 @@ async def test_plant_details(cookie_client: AsyncClient):
     assert plant.name in content
 
 
+async def test_plant_details_cached(cookie_client: AsyncClient):
+    """Tests serving plant details from the cache until plant gets edited."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    _, _, plant = await create_test_plant_instances(user)
+    await cookie_client.get(f"/plants/{plant.uuid}")
+    await Plant.filter(uuid=plant.uuid).update(name="Changed Name")
+
+    cached_content = (await cookie_client.get(f"/plants/{plant.uuid}")).text
+    assert "Changed Name" not in cached_content
+
+    await cookie_client.post(
+        f"/plant/edit/{plant.pk}", data=PLANT_EDIT_PAYLOAD, files=EMPTY_FILE
+    )
+    content = (await cookie_client.get(f"/plants/{plant.uuid}")).text
+    assert PLANT_EDIT_PAYLOAD["name"] in content
+
+
+async def test_plant_details_not_modified(cookie_client: AsyncClient):
+    """Tests revalidating plant details page using the etag."""
+    _, _, plant = await create_test_plant_instances()
+    etag = (await cookie_client.get(f"/plants/{plant.uuid}")).headers["etag"]
+    response = await cookie_client.get(
+        f"/plants/{plant.uuid}", headers={"If-None-Match": "*"}
+    )
+    other_response = await cookie_client.get(
+        f"/plants/{plant.uuid}", headers={"If-None-Match": '"other"'}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert other_response.status_code == 200
+
+
 async def test_plant_details_not_existing_plant(cookie_client: AsyncClient):
     """Tests plant details route for not existing plant."""
     response = await cookie_client.get(f"/plants/{uuid.uuid4()}")
@@ -176,6 +322,20 @@ async def test_plant_create_wrong_payload(cookie_client: AsyncClient):
     assert plant is None
 
 
+async def test_plant_create_too_large_image(cookie_client: AsyncClient):
+    """Tests rendering the size error of the plant image in the create form."""
+    files = {"image": ("large_image.jpg", bytes(8), "image/jpeg")}
+    with mock.patch.object(settings, "MAX_IMAGE_SIZE", 4):
+        response = await cookie_client.post(
+            "/plant/create", data=PLANT_PAYLOAD, files=files
+        )
+
+    assert response.status_code == 422
+    assert "Image can&#39;t be larger than 0 MB" in response.content.decode()
+    assert await Image.all().count() == 0
+    assert await Plant.all().count() == 0
+
+
 async def test_plant_delete(cookie_client: AsyncClient):
     """Tests deleting plant."""
     user = await User.get(email=TEST_USER_EMAIL)
@@ -259,6 +419,7 @@ async def test_plant_edit(cookie_client: AsyncClient):
     assert "Plant has been edited successfully" in content
     await plant.refresh_from_db()
     await plant.fetch_related("image")
+    assert plant.version == 2
     await check_all_fields(plant, payload, user)
 
 
@@ -280,6 +441,7 @@ async def test_plant_edit_new_image(cookie_client: AsyncClient):
     await plant.refresh_from_db()
     await plant.fetch_related("image")
     assert plant.image != old_image
+    assert not await Image.exists(pk=old_image.pk)
     await check_all_fields(plant, payload, user)
 
 
@@ -305,6 +467,23 @@ async def test_plant_edit_wrong_payload(cookie_client: AsyncClient):
     assert "Wrong humidity value" in content
 
 
+async def test_plant_edit_too_large_image(cookie_client: AsyncClient):
+    """Tests rendering the size error of the new plant image in the edit form."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    _, image, plant = await create_test_plant_instances(user)
+    files = {"image": ("large_image.jpg", bytes(8), "image/jpeg")}
+    with mock.patch.object(settings, "MAX_IMAGE_SIZE", 4):
+        response = await cookie_client.post(
+            f"/plant/edit/{plant.pk}", data=PLANT_EDIT_PAYLOAD, files=files
+        )
+    await plant.refresh_from_db()
+
+    assert response.status_code == 422
+    assert "Image can&#39;t be larger than 0 MB" in response.content.decode()
+    assert plant.image_id == image.pk
+    assert await Image.all().count() == 1
+
+
 async def test_plant_edit_no_plant(cookie_client: AsyncClient):
     """Tests editing not existing plant."""
     response = await cookie_client.post(
@@ -1,12 +1,17 @@
 import uuid
+from unittest import mock
 
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 from pydantic import SecretStr
 
 from src.database.models import Image, Plant, User
 from src.database.models.enums import Conditions
-from src.services.hashing import HashingService
+from src.services.hashing import HashingService, hashing_pool
+from src.services.rate_limit import email_limiter
+from src.services.refresh_token import RefreshTokenService
+from src.settings import settings
 from tests.conftest import TEST_USER_EMAIL
 
 PLANT_PAYLOAD = {
@@ -127,6 +132,21 @@ async def test_register_form_existing_user(client: AsyncClient):
     assert await User.all().count() == 1
 
 
+async def test_register_form_hashing_pool_busy(client: AsyncClient):
+    """Checks rendering the form with the error if the hashing pool is saturated."""
+    with mock.patch.object(hashing_pool, "max_pending", 1), mock.patch.object(
+        hashing_pool, "running", 1
+    ):
+        response = await client.post("/register", data=USER_PAYLOAD)
+    content = response.content.decode()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert "Server is busy, try again later" in content
+    assert "Already have an account?" in content
+    assert await User.all().count() == 0
+
+
 async def test_login_route(client: AsyncClient):
     """Checks route with user login form."""
     response = await client.get("/login")
@@ -189,6 +209,22 @@ async def test_login_form(client: AsyncClient):
     assert dashboard_unique_text in content
 
 
+async def test_login_form_single_lookup(client: AsyncClient):
+    """Checks if login form validators share a single user lookup."""
+    await User.create(
+        email=USER_PAYLOAD["email"],
+        hashed_password=HashingService.get_hashed_password(
+            SecretStr(USER_PAYLOAD["password"])
+        ),
+    )
+
+    with mock.patch.object(User, "get_or_none", wraps=User.get_or_none) as get_user:
+        response = await client.post("/login", data=USER_PAYLOAD, allow_redirects=False)
+
+    assert response.status_code == 302
+    get_user.assert_called_once_with(email=USER_PAYLOAD["email"])
+
+
 async def test_login_form_not_existing_user(client: AsyncClient):
     """Checks logging user in using form with not existing user."""
     response = await client.post("/login", data=USER_PAYLOAD)
@@ -200,6 +236,19 @@ async def test_login_form_not_existing_user(client: AsyncClient):
     assert user_error in content
 
 
+async def test_login_form_rate_limited(client: AsyncClient):
+    """Checks limiting the login form attempts concerning a single account."""
+    with mock.patch.object(email_limiter, "burst", 1):
+        first_response = await client.post("/login", data=USER_PAYLOAD)
+        second_response = await client.post("/login", data=USER_PAYLOAD)
+
+    assert first_response.status_code == 422
+    assert second_response.status_code == 429
+    assert "retry-after" in second_response.headers
+    assert "Too many requests, try again later" in second_response.content.decode()
+    assert "Don't have an account?" in second_response.content.decode()
+
+
 async def test_login_form_wrong_password(client: AsyncClient):
     """Checks logging user in using form with not existing user."""
     instance_payload = {
@@ -220,6 +269,7 @@ async def test_login_form_wrong_password(client: AsyncClient):
 
 async def test_logout(cookie_client: AsyncClient):
     """Checks user logout view."""
+    cookies = dict(cookie_client.cookies)
     response = await cookie_client.get("/logout")
     content = response.content.decode()
 
@@ -228,6 +278,16 @@ async def test_logout(cookie_client: AsyncClient):
     assert response.status_code == 200
     assert logout_message in content
     assert response.cookies == {}
+    cookie_client.cookies = cookies
+    assert "Logout" not in (await cookie_client.get("/")).content.decode()
+
+
+async def test_logout_no_user(client: AsyncClient):
+    """Checks user logout view without the cookie."""
+    response = await client.get("/logout")
+
+    assert response.status_code == 200
+    assert "You have been logged out successfully" in response.content.decode()
 
 
 async def test_user_profile(cookie_client: AsyncClient):
@@ -240,6 +300,54 @@ async def test_user_profile(cookie_client: AsyncClient):
     assert user.email in content
 
 
+@mock.patch.object(settings, "PAGE_SIZE", 1)
+async def test_user_profile_cards(cookie_client: AsyncClient):
+    """Checks loading next user profile plants pages as card fragments."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    for name in ("First Plant", "Second Plant"):
+        await Plant.create(
+            **{**PLANT_PAYLOAD, "name": name},
+            creator=user,
+            image=await Image.create(name="some_name.jpg", path="some/path"),
+        )
+
+    response = await cookie_client.get(f"/profile/{user.pk}")
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert "<h3>2</h3>" in content
+    assert "First Plant" in content
+    assert "Second Plant" not in content
+
+    next_url = content.split("data-load-more>")[1].split('href="')[1].split('"')[0]
+    assert next_url.startswith(f"/profile/{user.pk}/plants")
+    response = await cookie_client.get(next_url)
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert "Second Plant" in content
+    assert "First Plant" not in content
+    assert "Load more" not in content
+
+
+async def test_user_profile_cards_no_user(client: AsyncClient):
+    """Checks loading user profile plants cards with wrong user uuid."""
+    response = await client.get(
+        f"/profile/{uuid.uuid4()}/plants", params={"cursor": "cursor"}
+    )
+    assert response.status_code == 404
+
+
+async def test_user_profile_not_modified(client: AsyncClient):
+    """Checks revalidating user profile page, cookie clearing is kept."""
+    user = await User.create(**USER_PAYLOAD, hashed_password=USER_PAYLOAD["password"])
+    etag = (await client.get(f"/profile/{user.pk}")).headers["etag"]
+    response = await client.get(f"/profile/{user.pk}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert "access_token" in response.headers["set-cookie"]
+
+
 async def test_user_profile_no_user(client: AsyncClient):
     """Checks user profile view with wrong user uuid."""
     response = await client.get(f"/profile/{uuid.uuid4()}")
@@ -262,6 +370,19 @@ async def test_user_delete(cookie_client: AsyncClient):
     assert not await User.get_or_none(email=TEST_USER_EMAIL)
 
 
+async def test_user_delete_plant_images(cookie_client: AsyncClient):
+    """Checks deleting images of the users plants along with the user."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    image = await Image.create(name="plant.jpg", path="/static/plant_images/user.jpg")
+    await Plant.create(**PLANT_PAYLOAD, creator=user, image=image)
+    with mock.patch("src.database.models.images.file_collector") as collector:
+        response = await cookie_client.post(f"/profile/{user.pk}")
+
+    assert response.status_code == 200
+    assert not await Image.exists(pk=image.pk)
+    collector.enqueue.assert_called_once_with(image.path)
+
+
 async def test_user_delete_no_user(client: AsyncClient):
     """Checks user delete view with no user."""
     response = await client.post(f"/profile/{uuid.uuid4()}")
@@ -323,6 +444,7 @@ async def test_change_password_form_wrong_user(cookie_client: AsyncClient):
 async def test_change_password(cookie_client: AsyncClient):
     """Checks changing password for correct user."""
     user = await User.get(email=TEST_USER_EMAIL)
+    refresh_token = await RefreshTokenService.issue(user)
     response = await cookie_client.post(
         f"/change_password/{user.pk}", data=PASSWORD_PAYLOAD
     )
@@ -330,12 +452,34 @@ async def test_change_password(cookie_client: AsyncClient):
 
     assert response.status_code == 200
     assert "Password has been changed successfully!" in content
+    assert response.cookies["access_token"].startswith('"Bearer ')
+    with pytest.raises(HTTPException):
+        await RefreshTokenService.rotate(refresh_token)
     await user.refresh_from_db()
     assert HashingService.verify_password(
         SecretStr(PASSWORD_PAYLOAD["password"]), user.hashed_password
     )
 
 
+async def test_change_password_rate_limited(cookie_client: AsyncClient):
+    """Checks limiting the password changes of a single user."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    payload = {**PASSWORD_PAYLOAD, "old_password": "wrong-password"}
+    with mock.patch.object(email_limiter, "burst", 1):
+        first_response = await cookie_client.post(
+            f"/change_password/{user.pk}", data=payload
+        )
+        second_response = await cookie_client.post(
+            f"/change_password/{user.pk}", data=payload
+        )
+
+    assert first_response.status_code == 422
+    assert second_response.status_code == 429
+    assert "Too many requests, try again later" in second_response.content.decode()
+    assert "Change your password" in second_response.content.decode()
+    assert ("user", str(user.pk)) in email_limiter.buckets
+
+
 async def test_change_password_no_user(client: AsyncClient):
     """Checks changing user password for no user."""
     response = await client.post(
@@ -375,12 +519,46 @@ async def test_change_password_errors(cookie_client: AsyncClient):
     content = response.content.decode()
 
     assert response.status_code == 422
-    assert "Password you have entered is not correct" in content
+    assert "Password is too short" in content
     assert "Passwords didn't match".replace("'", "&#39;") in content
+    assert "Password you have entered is not correct" not in content
     await user.refresh_from_db()
     assert not HashingService.verify_password(
         SecretStr(PASSWORD_PAYLOAD["password"]), user.hashed_password
     )
 
 
+async def test_change_password_wrong_old_password(cookie_client: AsyncClient):
+    """Checks changing password for correct user with wrong old password."""
+    user = await User.get(email=TEST_USER_EMAIL)
+    payload = {**PASSWORD_PAYLOAD, "old_password": "absolutely-wrong"}
+    response = await cookie_client.post(f"/change_password/{user.pk}", data=payload)
+    content = response.content.decode()
+
+    assert response.status_code == 422
+    assert "Password you have entered is not correct" in content
+
+
+async def test_register_form_errors_skip_async_validators(client: AsyncClient):
+    """Checks if invalid registration never reaches the db or hashing."""
+    payload = {**USER_PAYLOAD, "password_confirm": "dont-match"}
+    with mock.patch.object(User, "get_or_none") as get_user, mock.patch.object(
+        HashingService, "get_hashed_password_async"
+    ) as hash_password:
+        response = await client.post("/register", data=payload)
+
+    assert response.status_code == 422
+    get_user.assert_not_called()
+    hash_password.assert_not_called()
+
+
+async def test_login_form_no_user_skips_hashing(client: AsyncClient):
+    """Checks if password is not verified when the user does not exist."""
+    with mock.patch.object(HashingService, "verify_password_async") as verify:
+        response = await client.post("/login", data=USER_PAYLOAD)
+
+    assert response.status_code == 422
+    verify.assert_not_called()
+
+
 # TODO: It's a crime that those tests are not parametrized
@@ -3,6 +3,7 @@ from unittest.mock import Mock
 
 from starlette.testclient import TestClient
 
+from src.api.middleware.response import templates
 from src.main import app
 
 
@@ -11,3 +12,4 @@ def test_app_events(mock_init_db: Mock):
     """Tests app startup & shutdown events."""
     with TestClient(app):
         mock_init_db.assert_called_once()
+        assert len(templates.env.cache) >= len(templates.env.list_templates())
@@ -1,12 +1,13 @@
+from pathlib import Path
+from types import SimpleNamespace
 from unittest import mock
 from unittest.mock import Mock
 
 import pytest
 from httpx import AsyncClient
 from starlette.testclient import TestClient
-from tortoise import Tortoise
 
-from src.database.config import create_superuser, generate_schema
+from src.database.config import apply_migrations, create_superuser, load_migrations
 from src.database.models import User
 from src.main import app
 from src.settings import settings
@@ -26,22 +27,42 @@ def test_database_init(mock_register_tortoise: Mock):
         )
 
 
+FAKE_MIGRATIONS = [
+    SimpleNamespace(
+        __name__="src.database.migrations.0001_table",
+        atomic=True,
+        upgrade=['CREATE TABLE "pytest" ("id" INT NOT NULL)'],
+    ),
+    SimpleNamespace(
+        __name__="src.database.migrations.0002_index",
+        atomic=False,
+        upgrade=['CREATE INDEX "idx_pytest" ON "pytest" ("id")'],
+    ),
+]
+
+
 @pytest.mark.asyncio
-@mock.patch.object(Tortoise, "close_connections")
-@mock.patch.object(Tortoise, "generate_schemas")
-@mock.patch.object(Tortoise, "init")
-async def test_generate_schema(
-    mock_init: Mock, mock_generate_schemas: Mock, mock_close_connections: Mock
-):
-    """Tests calling schema functions."""
-    await generate_schema()
-    mock_init.assert_called_once()
-    mock_init.assert_called_with(
-        db_url=settings.DATABASE_URL,
-        modules={"models": settings.APP_MODELS},
-    )
-    mock_generate_schemas.assert_called_once()
-    mock_close_connections.assert_called_once()
+@mock.patch("src.database.config.load_migrations", return_value=FAKE_MIGRATIONS)
+async def test_apply_migrations(mock_load_migrations: Mock, tmp_path: Path):
+    """Tests applying migrations only once."""
+    with mock.patch.object(settings, "DATABASE_URL", f"sqlite://{tmp_path}/db.sqlite3"):
+        applied = await apply_migrations()
+        applied_again = await apply_migrations()
+
+    assert applied == ["0001_table", "0002_index"]
+    assert applied_again == []
+
+
+def test_load_migrations():
+    """Tests loading migration modules in version order."""
+    migrations = load_migrations()
+    names = [migration.__name__.rsplit(".", 1)[-1] for migration in migrations]
+
+    assert names == sorted(names)
+    assert names[0] == "0001_initial"
+    for migration in migrations:
+        assert isinstance(migration.atomic, bool)
+        assert all(isinstance(statement, str) for statement in migration.upgrade)
 
 
 @pytest.mark.asyncio
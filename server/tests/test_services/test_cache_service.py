@@ -0,0 +1,150 @@
+import asyncio
+import os
+from pathlib import Path
+from time import time
+from unittest import mock
+
+import pytest
+
+from src.services.cache import DiskLRUCache, TTLCache
+
+
+def test_cache_hit_and_miss():
+    """Tests retrieving stored and not stored values."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(("plant", 1), "first")
+
+    assert cache.get(("plant", 1)) == "first"
+    assert cache.get(("plant", 2)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expiration():
+    """Tests dropping entries older than the time to live."""
+    cache = TTLCache(max_size=2, ttl=60)
+    with mock.patch("src.services.cache.time.monotonic", return_value=0):
+        cache.set(("plant", 1), "first")
+    with mock.patch("src.services.cache.time.monotonic", return_value=61):
+        assert cache.get(("plant", 1)) is None
+
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_lru_eviction():
+    """Tests evicting the least recently used entry when cache is full."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(("plant", 1), "first")
+    cache.set(("plant", 2), "second")
+    cache.get(("plant", 1))
+    cache.set(("plant", 3), "third")
+
+    assert cache.get(("plant", 2)) is None
+    assert cache.get(("plant", 1)) == "first"
+    assert cache.get(("plant", 3)) == "third"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_delete_namespace():
+    """Tests dropping entries by key namespace."""
+    cache = TTLCache(max_size=4, ttl=60)
+    cache.set(("plants", 1), "first page")
+    cache.set(("plants", 2), "second page")
+    cache.set(("plant", 1), "plant")
+    cache.delete_namespace("plants")
+
+    assert cache.stats()["size"] == 1
+    assert cache.get(("plant", 1)) == "plant"
+
+
+def write_cached_file(cache: DiskLRUCache, name: str, size: int) -> int:
+    """Writes a file of given size to the cache directory."""
+    (Path(cache.directory) / name).write_bytes(bytes(size))
+    return size
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_eviction(tmp_path: Path):
+    """Tests evicting the least recently used files above the size limit."""
+    cache = DiskLRUCache(str(tmp_path), max_size=10, lease_time=0)
+    for name in ["first", "second"]:
+        await cache.add(name, write_cached_file(cache, name, 4))
+    await cache.get("first")
+    await cache.add("third", write_cached_file(cache, "third", 4))
+
+    assert await cache.get("second") is None
+    assert await cache.get("first") == str(tmp_path / "first")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["first", "third"]
+    assert cache.size == 8
+    assert cache.evictions == 1
+    assert cache.removals == {}
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_keeps_leased_files(tmp_path: Path):
+    """Tests keeping the files returned within the lease time, even above the size."""
+    cache = DiskLRUCache(str(tmp_path), max_size=4, lease_time=60)
+    for name in ["first", "second"]:
+        await cache.add(name, write_cached_file(cache, name, 4))
+
+    assert cache.size == 8
+    with mock.patch("src.services.cache.time.monotonic", return_value=time() + 120):
+        await cache.get("first")
+        await cache.add("third", write_cached_file(cache, "third", 4))
+
+    assert list(cache.entries) == ["first", "third"]
+    assert not (tmp_path / "second").exists()
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_keeps_latest_file(tmp_path: Path):
+    """Tests keeping the most recent file, even if it's larger than the cache,
+    and replacing the size of the file added again.
+    """
+    cache = DiskLRUCache(str(tmp_path), max_size=2, lease_time=0)
+
+    assert await cache.add("large", write_cached_file(cache, "large", 4)) == str(
+        tmp_path / "large"
+    )
+    assert cache.size == 4
+    await cache.add("large", write_cached_file(cache, "large", 1))
+    assert cache.size == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_load(tmp_path: Path):
+    """Tests indexing files left by the previous run, oldest ones first."""
+    for index, name in enumerate(["old", "new", "partial.part"]):
+        (tmp_path / name).write_bytes(bytes(4))
+        os.utime(tmp_path / name, (index, index))
+    (tmp_path / "folder").mkdir()
+    cache = DiskLRUCache(str(tmp_path), max_size=4, lease_time=0)
+    await asyncio.gather(cache.load(), cache.load())
+
+    assert await cache.get("new") == str(tmp_path / "new")
+    assert await cache.get("old") is None
+    assert list(cache.entries) == ["new"]
+    cache.clear()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "folder",
+        "partial.part",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_location_waits_for_removal(tmp_path: Path):
+    """Tests returning the location of evicted file only once it's removed,
+    so the file written again isn't removed along with the evicted one.
+    """
+    cache = DiskLRUCache(str(tmp_path), max_size=4, lease_time=0)
+    await cache.add("first", write_cached_file(cache, "first", 4))
+    eviction = asyncio.ensure_future(
+        cache.add("second", write_cached_file(cache, "second", 4))
+    )
+    await asyncio.sleep(0)
+
+    assert "first" in cache.removals
+    assert await cache.location("first") == str(tmp_path / "first")
+    assert not (tmp_path / "first").exists()
+    await eviction
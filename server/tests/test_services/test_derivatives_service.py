@@ -0,0 +1,122 @@
+import io
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image as PILImage
+
+from src.database.models import Image, Plant
+from src.services.derivatives import (
+    derivatives_pipeline,
+    render_resized,
+    render_variants,
+)
+from tests.test_api.test_plants_api import PLANT_PAYLOAD
+
+
+def create_test_image(size: tuple[int, int], mode: str = "RGB") -> bytes:
+    """Returns a semi transparent, if the mode allows it, png image of given size."""
+    image_bytes = io.BytesIO()
+    PILImage.new(mode, size, (0, 128, 0, 128)).save(image_bytes, format="PNG")
+    return image_bytes.getvalue()
+
+
+def test_render_variants(tmp_path: Path):
+    """Tests saving downscaled variants in every supported format."""
+    source = tmp_path / "plant.png"
+    source.write_bytes(create_test_image((800, 600), "RGBA"))
+
+    variants = render_variants(str(source), [1280, 320, 640], ["avif", "webp", "jpeg"])
+
+    supported = [
+        name for name in ["avif", "webp", "jpeg"] if name.upper() in PILImage.SAVE
+    ]
+    assert [(variant["width"], variant["format"]) for variant in variants] == [
+        (width, name) for width in [320, 640] for name in supported
+    ]
+    with PILImage.open(tmp_path / "plant-320.jpeg") as variant:
+        assert variant.size == (320, 240)
+        assert variant.mode == "RGB"
+    with PILImage.open(tmp_path / "plant-640.webp") as variant:
+        assert variant.mode == "RGBA"
+    assert not list(tmp_path.glob("*.part"))
+
+
+@pytest.mark.parametrize(
+    "width,height,size", [(400, 100, (133, 100)), (None, None, (600, 450))]
+)
+def test_render_resized(tmp_path: Path, width: int, height: int, size: tuple[int, int]):
+    """Tests fitting the image into the box without upscaling it."""
+    source = tmp_path / "plant.png"
+    source.write_bytes(create_test_image((600, 450)))
+
+    file_size = render_resized(
+        str(source), str(tmp_path / "resized.webp"), width, height, "webp"
+    )
+
+    assert file_size == (tmp_path / "resized.webp").stat().st_size
+
+    with PILImage.open(tmp_path / "resized.webp") as resized:
+        assert resized.size == size
+        assert resized.format == "WEBP"
+
+
+@pytest.mark.asyncio
+async def test_create_variants(cookie_client: AsyncClient):
+    """Tests recording the variants and rendering them in the plant card."""
+    files = {"image": ("plant.png", create_test_image((700, 500)), "image/png")}
+    await cookie_client.post("/plant/create", data=PLANT_PAYLOAD, files=files)
+    plant = await Plant.get(name=PLANT_PAYLOAD["name"])
+    await cookie_client.get(f"/plants/{plant.pk}")
+    await derivatives_pipeline.wait()
+    await plant.refresh_from_db()
+    await plant.fetch_related("image")
+    responses = [
+        await cookie_client.get("/"),
+        await cookie_client.get(f"/plants/{plant.pk}"),
+    ]
+
+    assert {variant["width"] for variant in plant.image.variants} == {320, 640}
+    assert plant.version == 2
+    for response in responses:
+        content = response.content.decode()
+        assert 'type="image/webp"' in content
+        for variant in plant.image.variants:
+            assert f'{variant["path"]} {variant["width"]}w' in content
+
+
+@pytest.mark.asyncio
+async def test_create_variants_not_an_image(cookie_client: AsyncClient):
+    """Tests falling back to the original file if it can't be resized."""
+    files = {"image": ("plant.jpg", b"not an image", "image/jpeg")}
+    await cookie_client.post("/plant/create", data=PLANT_PAYLOAD, files=files)
+    await derivatives_pipeline.wait()
+    plant = await Plant.get(name=PLANT_PAYLOAD["name"]).prefetch_related("image")
+    response = await cookie_client.get(f"/plants/{plant.pk}")
+    content = response.content.decode()
+
+    assert plant.image.variants == []
+    assert plant.version == 1
+    assert f'<img src="{plant.image.path}"' in content
+    assert "srcset" not in content
+
+
+@pytest.mark.asyncio
+async def test_create_variants_identical_image(cookie_client: AsyncClient):
+    """Tests sharing the file and its variants between identical uploads."""
+    image = create_test_image((700, 500))
+    with mock.patch.object(
+        derivatives_pipeline, "run", wraps=derivatives_pipeline.run
+    ) as run:
+        for name in ("First plant", "Second plant"):
+            files = {"image": ("plant.png", image, "image/png")}
+            payload = {**PLANT_PAYLOAD, "name": name}
+            await cookie_client.post("/plant/create", data=payload, files=files)
+            await derivatives_pipeline.wait()
+    first, second = await Image.all().order_by("created_at")
+
+    assert run.call_count == 1
+    assert first.digest == second.digest
+    assert first.path == second.path
+    assert first.variants == second.variants != []
@@ -0,0 +1,42 @@
+from unittest import mock
+
+import pytest
+
+from src.services.garbage import FileCollector
+from tests.test_api.test_plants_api import create_image_file
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_collect_files():
+    """Tests removing the queued files in batches, skipping the recently modified."""
+    collector = FileCollector(batch_size=2, grace_period=60)
+    paths = [f"/static/collected/{index}.jpg" for index in range(3)]
+    locations = [create_image_file(path) for path in paths]
+    fresh_location = create_image_file("/static/collected/fresh.jpg", age=0)
+
+    with mock.patch.object(
+        collector, "remove_files", wraps=collector.remove_files
+    ) as remove_files:
+        collector.enqueue(*paths, "/static/collected/fresh.jpg")
+        collector.enqueue("/static/collected/missing.jpg", "/outside/static.jpg")
+        await collector.wait()
+
+    assert remove_files.call_count == 3
+    assert not any(location.exists() for location in locations)
+    assert fresh_location.exists()
+    assert (collector.removed, collector.skipped) == (3, 2)
+    assert collector.pending == {}
+
+
+async def test_collect_files_error():
+    """Tests skipping the file which can't be removed."""
+    collector = FileCollector(batch_size=2, grace_period=60)
+    location = create_image_file("/static/collected/locked.jpg")
+
+    with mock.patch("src.services.garbage.os.remove", side_effect=PermissionError):
+        collector.enqueue("/static/collected/locked.jpg")
+        await collector.wait()
+
+    assert location.exists()
+    assert collector.skipped == 1
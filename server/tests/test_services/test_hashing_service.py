@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from pydantic import SecretStr
+
+from src.services.hashing import (
+    CALIBRATED_COSTS,
+    HashingPool,
+    HashingService,
+    build_password_context,
+)
+
+
+async def wait_for_stats(pool: HashingPool, timeout: float = 5, **expected: int):
+    """Polls the pool stats until the given counters match, fails after the timeout."""
+
+    async def poll() -> None:
+        while {name: pool.stats()[name] for name in expected} != expected:
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_hashing_async():
+    """Tests hashing and verifying passwords in the hashing pool."""
+    password = SecretStr("some-password")
+    hashed_password = await HashingService.get_hashed_password_async(password)
+
+    assert await HashingService.verify_password_async(password, hashed_password)
+    assert not await HashingService.verify_password_async(
+        SecretStr("other-password"), hashed_password
+    )
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated():
+    """Tests rejecting calls once the pool has the max number of pending ones."""
+    pool = HashingPool(max_workers=1, max_pending=2)
+    release = threading.Event()
+    pending = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await wait_for_stats(pool, running=1, queued=1)
+
+    with pytest.raises(HTTPException) as error:
+        await pool.run(sum, [1, 2])
+    release.set()
+
+    assert await asyncio.gather(*pending) == [True, True]
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert pool.stats()["rejected"] == 1
+    assert await pool.run(sum, [1, 2]) == 3
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_queue():
+    """Tests capping the concurrency and counting the queued calls."""
+    pool = HashingPool(max_workers=1)
+    release = threading.Event()
+    blocked = asyncio.ensure_future(pool.run(release.wait))
+    queued = [asyncio.ensure_future(pool.run(sum, [1, 2])) for _ in range(2)]
+    await wait_for_stats(pool, running=1, queued=2)
+
+    queued[1].cancel()
+    await wait_for_stats(pool, running=1, queued=1)
+    release.set()
+    assert await blocked is True
+    assert await queued[0] == 3
+    await wait_for_stats(pool, running=0, queued=0, completed=2)
+
+    assert pool.stats()["max_queued"] >= 2
+
+
+@pytest.mark.parametrize("scheme", ["bcrypt", "argon2", "scrypt"])
+def test_build_password_context(scheme: str):
+    """Tests hashing with the configured schemes and costs."""
+    if scheme == "argon2":
+        pytest.importorskip("argon2")
+    context = build_password_context(
+        [scheme], BCRYPT_ROUNDS=4, ARGON2_MEMORY_COST=1024, SCRYPT_ROUNDS=4
+    )
+    hashed_password = context.hash("some-password")
+
+    assert context.identify(hashed_password) == scheme
+    assert context.verify("some-password", hashed_password)
+    assert not context.needs_update(hashed_password)
+
+
+def test_build_password_context_deprecated_scheme():
+    """Tests marking hashes of other schemes and lower costs as outdated."""
+    context = build_password_context(["bcrypt", "scrypt"], BCRYPT_ROUNDS=5)
+    scrypt_hash = build_password_context(["scrypt"], SCRYPT_ROUNDS=4).hash("password")
+    cheap_hash = build_password_context(["bcrypt"], BCRYPT_ROUNDS=4).hash("password")
+
+    assert context.needs_update(scrypt_hash)
+    assert context.needs_update(cheap_hash)
+    assert context.verify_and_update("wrong", cheap_hash) == (False, None)
+
+
+def test_build_password_context_missing_backend():
+    """Tests failing on building the context with a scheme missing its backend."""
+    with mock.patch.object(bcrypt, "has_backend", return_value=False):
+        with pytest.raises(RuntimeError, match="bcrypt has no backend installed"):
+            build_password_context(["bcrypt"])
+
+
+def test_verify_and_update_password():
+    """Tests returning no new hash for the up to date one."""
+    password = SecretStr("some-password")
+    hashed_password = HashingService.get_hashed_password(password)
+
+    assert HashingService.verify_and_update_password(password, hashed_password) == (
+        True,
+        None,
+    )
+
+
+def test_calibrate():
+    """Tests picking the lowest cost reaching the target time,
+    or the highest one if target can't be reached.
+    """
+    assert HashingService.calibrate("bcrypt", 0)[:2] == ("BCRYPT_ROUNDS", 4)
+    with mock.patch.dict(CALIBRATED_COSTS, {"scrypt": ("SCRYPT_ROUNDS", range(1, 4))}):
+        setting, cost, elapsed = HashingService.calibrate("scrypt", float("inf"))
+
+    assert (setting, cost) == ("SCRYPT_ROUNDS", 3)
+    assert elapsed > 0
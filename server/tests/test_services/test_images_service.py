@@ -0,0 +1,142 @@
+import hashlib
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from httpx import AsyncClient
+
+from src.database.models import Image, Plant, User
+from src.services.derivatives import derivatives_pipeline
+from src.services.garbage import file_collector
+from src.services.images import ImageService
+from src.settings import settings
+from tests.test_api.test_plants_api import PLANT_PAYLOAD, create_image_file
+
+
+@pytest.mark.parametrize(
+    "size,bucket", [(None, None), (1, 80), (320, 320), (321, 480), (2560, 2560)]
+)
+def test_get_size_bucket(size: int, bucket: int):
+    """Tests rounding the sizes up to the nearest bucket."""
+    assert ImageService.get_size_bucket(size) == bucket
+
+
+@pytest.mark.asyncio
+async def test_create_file(client: AsyncClient, tmp_path: Path):
+    """Tests streaming the upload in chunks and storing it under its digest."""
+    content = b"image content" * 10
+    digest = hashlib.sha256(content).hexdigest()
+    upload = UploadFile("image.JPG", io.BytesIO(content))
+
+    with mock.patch.object(settings, "STATIC_DIR", str(tmp_path)):
+        with mock.patch.object(settings, "UPLOAD_CHUNK_SIZE", 16):
+            with mock.patch.object(upload, "read", wraps=upload.read) as read:
+                result = await ImageService.create_file(upload, "plant_images")
+
+    image_path = f"plant_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+    assert result == (digest, image_path)
+    assert (tmp_path / image_path).read_bytes() == content
+    assert read.call_count == len(content) // 16 + 2
+    assert list((tmp_path / "plant_images").iterdir()) == [
+        tmp_path / "plant_images" / digest[:2]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_image_identical_content(client: AsyncClient, tmp_path: Path):
+    """Tests storing the identical uploads only once, whatever their extensions."""
+    with mock.patch.object(settings, "STATIC_DIR", str(tmp_path)):
+        with mock.patch.object(derivatives_pipeline, "schedule"):
+            images = [
+                await ImageService.create_image(
+                    UploadFile(name, io.BytesIO(b"image content")), "plant_images"
+                )
+                for name in ("first.jpg", "second.jpeg")
+            ]
+
+    assert images[0].path == images[1].path
+    assert images[0].digest == images[1].digest
+    assert len(list(tmp_path.glob("plant_images/*/*/*"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_file_too_large(tmp_path: Path):
+    """Tests aborting the upload once it exceeds the max size."""
+    upload = UploadFile("image.jpg", io.BytesIO(bytes(64)))
+
+    with mock.patch.object(settings, "STATIC_DIR", str(tmp_path)):
+        with mock.patch.object(settings, "MAX_IMAGE_SIZE", 20):
+            with mock.patch.object(settings, "UPLOAD_CHUNK_SIZE", 16):
+                with mock.patch.object(upload, "read", wraps=upload.read) as read:
+                    with pytest.raises(HTTPException) as error:
+                        await ImageService.create_file(upload, "plant_images")
+
+    assert error.value.status_code == 413
+    assert read.call_count == 2
+    assert list((tmp_path / "plant_images").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_create_file_write_error(tmp_path: Path):
+    """Tests removing the temporary file if the upload can't be read."""
+    upload = UploadFile("image.jpg", io.BytesIO())
+
+    with mock.patch.object(settings, "STATIC_DIR", str(tmp_path)):
+        with mock.patch.object(upload, "read", side_effect=OSError):
+            with pytest.raises(OSError):
+                await ImageService.create_file(upload, "plant_images")
+
+    assert list((tmp_path / "plant_images").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_files(client: AsyncClient):
+    """Tests reclaiming images without a plant and files without an image,
+    reading the listings and the images one at a time.
+    """
+    user = await User.create(email="some@creator.com", hashed_password="password")
+    variant = {"path": "/static/reconciled/ab/used-320.webp", "width": 320}
+    used_image = await Image.create(
+        name="used.jpg", path="/static/reconciled/ab/used.jpg", variants=[variant]
+    )
+    await Plant.create(**PLANT_PAYLOAD, creator=user, image=used_image)
+    unused_images = [
+        await Image.create(name="unused.jpg", path=f"/static/reconciled/{index}.jpg")
+        for index in range(3)
+    ]
+    kept_paths = [*used_image.file_paths, "/static/reconciled/ab/fresh.jpg.part"]
+    orphaned_paths = [
+        *(image.path for image in unused_images),
+        "/static/reconciled/orphaned.jpg",
+        "/static/reconciled/ab/cd/orphaned.jpg.part",
+    ]
+    for path in kept_paths + orphaned_paths:
+        create_image_file(path, age=0 if path.endswith("fresh.jpg.part") else 3600)
+
+    static_dir = Path(settings.STATIC_DIR)
+    link = static_dir / "reconciled" / "link.jpg"
+    link.symlink_to("missing.jpg")
+    await Image.filter(pk__in=[image.pk for image in unused_images]).update(
+        created_at=datetime.now(timezone.utc) - timedelta(hours=1)
+    )
+
+    with mock.patch.object(settings, "IMAGE_GC_BATCH_SIZE", 1):
+        orphans = await ImageService.reconcile_files("reconciled")
+        await file_collector.wait()
+
+    assert orphans == 2
+    assert link.is_symlink()
+    assert await Image.all().count() == 1
+    for path in kept_paths:
+        assert (static_dir / path.removeprefix("/static/")).exists()
+    for path in orphaned_paths:
+        assert not (static_dir / path.removeprefix("/static/")).exists()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_files_missing_folder(client: AsyncClient):
+    """Tests reconciling the folder, which doesn't exist yet."""
+    assert await ImageService.reconcile_files("missing") == 0
@@ -0,0 +1,164 @@
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+
+from src.database.models import User
+from src.schemas.jwt_token import JwtTokenDecoded
+from src.services.cache import tokens_cache, users_cache
+from src.services.jwt_token import JwtTokenService
+from src.services.revocation import TokenRevocations
+
+
+def test_decode_jwt_cached():
+    """Tests verifying the token only once and reusing the cached payload."""
+    tokens_cache.clear()
+    token = JwtTokenService.encode_jwt("cached@token.com").access_token
+
+    with mock.patch("src.services.jwt_token.jwt.decode", wraps=jwt.decode) as decode:
+        first_payload = JwtTokenService.decode_jwt(token)
+        second_payload = JwtTokenService.decode_jwt(token)
+
+    assert decode.call_count == 1
+    assert first_payload is second_payload
+    assert first_payload.email == "cached@token.com"
+
+
+def test_decode_jwt_cached_expired():
+    """Tests rejecting the cached payload once the token expires."""
+    tokens_cache.clear()
+    token = JwtTokenService.encode_jwt("expired@token.com").access_token
+    decoded_token = JwtTokenService.decode_jwt(token)
+
+    with mock.patch("src.services.jwt_token.time.time") as mock_time:
+        mock_time.return_value = decoded_token.expires + 1
+        assert JwtTokenService.decode_jwt(token) is None
+
+
+def test_decode_jwt_expired():
+    """Tests rejecting expired token without caching it."""
+    tokens_cache.clear()
+    with mock.patch("src.services.jwt_token.time.time", return_value=0):
+        token = JwtTokenService.encode_jwt("expired@token.com").access_token
+
+    assert JwtTokenService.decode_jwt(token) is None
+    assert tokens_cache.stats()["size"] == 0
+
+
+def test_decode_jwt_wrong_token():
+    """Tests rejecting malformed token without caching it."""
+    tokens_cache.clear()
+
+    assert JwtTokenService.decode_jwt("not-a-token") is None
+    assert tokens_cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_user_from_token_cached(client: AsyncClient):
+    """Tests resolving the user once and dropping it after changes."""
+    user = await User.create(email="cached@user.com", hashed_password="password")
+    decoded_token = JwtTokenDecoded(email=user.email, expires=0)
+
+    with mock.patch.object(User, "get_or_none", wraps=User.get_or_none) as get_user:
+        first_user = await JwtTokenService.get_user_from_token(decoded_token)
+        second_user = await JwtTokenService.get_user_from_token(decoded_token)
+        assert get_user.call_count == 1
+        assert first_user is second_user
+
+        first_user.is_superuser = True
+        await first_user.save()
+        changed_user = await JwtTokenService.get_user_from_token(decoded_token)
+        assert get_user.call_count == 2
+        assert changed_user.is_superuser
+
+        await changed_user.delete()
+        assert not await JwtTokenService.get_user_from_token(decoded_token, False)
+        assert users_cache.get(("user", user.email)) is None
+
+
+@pytest.mark.asyncio
+async def test_encode_user_jwt_claims(client: AsyncClient):
+    """Tests trusting the token claims without querying the db."""
+    user = await User.create(
+        email="claims@user.com", hashed_password="password", is_superuser=True
+    )
+    token = JwtTokenService.encode_user_jwt(user).access_token
+    decoded_token = JwtTokenService.decode_jwt(token)
+
+    with mock.patch.object(User, "get_or_none") as get_user:
+        token_user = await JwtTokenService.get_token_user(decoded_token)
+
+    get_user.assert_not_called()
+    assert token_user.uuid == user.uuid
+    assert token_user.email == user.email
+    assert token_user.is_superuser
+
+
+@pytest.mark.asyncio
+async def test_get_token_user_without_claims(client: AsyncClient):
+    """Tests falling back to the user lookup for tokens without claims."""
+    user = await User.create(email="legacy@user.com", hashed_password="password")
+    token = JwtTokenService.encode_jwt(user.email).access_token
+    token_user = await JwtTokenService.get_token_user(JwtTokenService.decode_jwt(token))
+
+    assert token_user.uuid == user.uuid
+    assert not token_user.is_superuser
+
+
+@pytest.mark.asyncio
+async def test_revoke_jwt(client: AsyncClient):
+    """Tests revoking a single token, leaving the other ones valid."""
+    token = JwtTokenService.encode_jwt("revoked@token.com").access_token
+    other_token = JwtTokenService.encode_jwt("revoked@token.com").access_token
+
+    assert JwtTokenService.revoke_jwt(token)
+    assert JwtTokenService.decode_jwt(token) is None
+    assert JwtTokenService.decode_jwt(other_token) is not None
+    assert not JwtTokenService.revoke_jwt(token)
+
+
+@pytest.mark.asyncio
+async def test_user_changes_revoke_tokens(client: AsyncClient):
+    """Tests revoking all the users tokens after the user gets updated or deleted."""
+    user = await User.create(email="changed@user.com", hashed_password="password")
+    token = JwtTokenService.encode_user_jwt(user).access_token
+    user.is_superuser = True
+    await user.save()
+    new_token = JwtTokenService.encode_user_jwt(user).access_token
+
+    assert JwtTokenService.decode_jwt(token) is None
+    assert JwtTokenService.decode_jwt(new_token).is_superuser
+
+    await user.delete()
+    assert JwtTokenService.decode_jwt(new_token) is None
+
+
+@pytest.mark.parametrize("clock", [[100, 100, 100], [100, 100, 99]])
+def test_token_issued_after_revocation(clock: list[float]):
+    """Tests keeping the token issued right after the revocation valid,
+    even if the clock didn't advance or got set back meanwhile.
+    """
+    revocations = TokenRevocations(lifetime=60)
+    with mock.patch("src.services.revocation.time.time", side_effect=clock):
+        revocations.revoke_user("revoked@user.com")
+        issued = revocations.issue_time("revoked@user.com")
+    decoded_token = JwtTokenDecoded(
+        email="revoked@user.com", expires=issued + 60, issued=issued
+    )
+
+    assert issued > 100
+    assert not revocations.is_revoked(decoded_token)
+
+
+def test_revocations_pruned():
+    """Tests dropping revocations of already expired tokens."""
+    revocations = TokenRevocations(lifetime=60)
+    with mock.patch("src.services.revocation.time.time", return_value=0):
+        revocations.revoke_token("expired", 30)
+        revocations.revoke_user("revoked@user.com")
+    with mock.patch("src.services.revocation.time.time", return_value=61):
+        revocations.revoke_token("valid", 90)
+
+    assert revocations.tokens == {"valid": 90}
+    assert revocations.users == {}
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from src.services.rate_limit import RateLimiter
+
+
+def test_acquire_burst():
+    """Tests allowing a burst of calls and limiting the next one."""
+    limiter = RateLimiter(rate=0.5, burst=2, max_keys=10)
+    with mock.patch("src.services.rate_limit.time.monotonic", return_value=100.0):
+        waits = [limiter.acquire("key") for _ in range(3)]
+        other_wait = limiter.acquire("other-key")
+
+    assert waits == [0, 0, 2.0]
+    assert other_wait == 0
+
+
+def test_acquire_refill():
+    """Tests regaining tokens over time, up to the burst size."""
+    limiter = RateLimiter(rate=1.0, burst=2, max_keys=10)
+    with mock.patch("src.services.rate_limit.time.monotonic") as mock_time:
+        mock_time.return_value = 100.0
+        limiter.acquire("key")
+        limiter.acquire("key")
+        mock_time.return_value = 101.5
+        assert limiter.acquire("key") == 0
+        assert limiter.acquire("key") == 0.5
+        mock_time.return_value = 1000.0
+        assert limiter.buckets["key"][0] < 1
+        assert [limiter.acquire("key") for _ in range(3)] == [0, 0, 1.0]
+
+
+def test_acquire_evicts_least_recently_used():
+    """Tests dropping the least recently used buckets above the keys limit."""
+    limiter = RateLimiter(rate=1.0, burst=1, max_keys=2)
+    for key in ["first", "second", "first", "third"]:
+        limiter.acquire(key)
+
+    assert list(limiter.buckets) == ["first", "third"]
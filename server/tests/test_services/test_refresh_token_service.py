@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from src.database.models import RefreshToken, User
+from src.services.refresh_token import RefreshTokenService
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_rotate_concurrently(client: AsyncClient):
+    """Tests treating concurrent refreshes as a reuse, without leaving
+    any successor in the revoked family.
+    """
+    user = await User.create(email="concurrent@refresh.com", hashed_password="pass")
+    refresh_token = await RefreshTokenService.issue(user)
+
+    results = await asyncio.gather(
+        RefreshTokenService.rotate(refresh_token),
+        RefreshTokenService.rotate(refresh_token),
+        return_exceptions=True,
+    )
+
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert errors
+    assert errors[0].detail == "Refresh token has already been used"
+    assert await RefreshToken.filter(is_revoked=False).count() == 0
+
+
+async def test_rotate_expired(client: AsyncClient):
+    """Tests rejecting the expired token and dropping it on the next issue."""
+    user = await User.create(email="expired@refresh.com", hashed_password="pass")
+    refresh_token = await RefreshTokenService.issue(user)
+    await RefreshToken.all().update(
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    )
+
+    with pytest.raises(HTTPException):
+        await RefreshTokenService.rotate(refresh_token)
+    await RefreshTokenService.issue(user)
+    assert await RefreshToken.all().count() == 1
+
+
+async def test_revoke_user(client: AsyncClient):
+    """Tests revoking all the users families, leaving other users intact."""
+    user = await User.create(email="revoked@refresh.com", hashed_password="pass")
+    other_user = await User.create(email="other@refresh.com", hashed_password="pass")
+    await RefreshTokenService.issue(user)
+    await RefreshTokenService.issue(user)
+    other_token = await RefreshTokenService.issue(other_user)
+
+    await RefreshTokenService.revoke_user(user)
+
+    assert await RefreshToken.filter(user_id=user.pk, is_revoked=False).count() == 0
+    _, rotated_token = await RefreshTokenService.rotate(other_token)
+    assert rotated_token